@@ -1,8 +1,8 @@
 from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
-import re
 import os
 from src.infra.deepseek_client import translate_text_strict
+from src.domain.transcript_format import parse_transcript_segments, format_bilingual_text
 from src.config.settings import DEEPSEEK_API_KEY
 from bs4 import BeautifulSoup
 
@@ -58,65 +58,13 @@ def parse_transcript():
         return []
 
     with open(TRANSCRIPT_FILE, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    segments = []
-    current_segment = {"speaker": None, "english": "", "chinese": ""}
-    mode = "none"  # "english", "chinese"
-
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-
-        # Check for Speaker pattern: [Name]:
-        match_speaker = re.match(r'^\[(.*?)]: (.*)', line)
-        if match_speaker:
-            # Save previous segment
-            if current_segment['speaker'] or current_segment['english'] or current_segment['chinese']:
-                current_segment['english'] = current_segment['english'].strip()
-                current_segment['chinese'] = current_segment['chinese'].strip()
-                segments.append(current_segment)
-
-            speaker = match_speaker.group(1)
-            text = match_speaker.group(2)
-            current_segment = {"speaker": speaker, "english": text, "chinese": ""}
-            mode = "english"
-            continue
-
-        # Check for Chinese marker: (中文):
-        if line.startswith("(中文):"):
-            text = line[len("(中文):"):].strip()
-            current_segment['chinese'] = text
-            mode = "chinese"
-            continue
-
-        # Append to current mode
-        if mode == "english":
-            current_segment['english'] += " " + line
-        elif mode == "chinese":
-            current_segment['chinese'] += "\n" + line # Preserve newlines for Chinese if any
-
-    # Add last segment
-    if current_segment['speaker'] or current_segment['english'] or current_segment['chinese']:
-        current_segment['english'] = current_segment['english'].strip()
-        current_segment['chinese'] = current_segment['chinese'].strip()
-        segments.append(current_segment)
-        
-    return segments
+        return parse_transcript_segments(f.read())
 
 def save_transcript(segments):
     """Saves the segments back to the file in the correct format."""
     try:
         with open(TRANSCRIPT_FILE, 'w', encoding='utf-8') as f:
-            for segment in segments:
-                speaker = segment['speaker']
-                english = segment['english']
-                chinese = segment['chinese']
-                
-                f.write(f"[{speaker}]: {english}\n")
-                f.write(f"(中文): {chinese}\n")
-                f.write("\n") # Empty line between segments
+            f.write(format_bilingual_text(segments))
         return True
     except Exception as e:
         print(f"Error saving transcript: {e}")
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.service.scrape_service import iter_blocks, map_speakers, write_transcript
+
+SIZES = [10_000, 20_000, 40_000, 80_000, 160_000]
+HOST = "Host"
+GUEST = "Guest"
+
+def make_utterances(count):
+    # 每 3 句换一次说话人，接近真实访谈的块长度
+    return [
+        {"speaker": f"SPEAKER_{(i // 3) % 2}", "text": f"utterance number {i} with a few words", "start": i * 2.0, "end": i * 2.0 + 1.5}
+        for i in range(count)
+    ]
+
+def write_concat(path, transcript_data, speaker_map):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(build_text_concat(transcript_data, speaker_map))
+
+def build_text_concat(transcript_data, speaker_map):
+    # 旧实现：逐句 += 拼接整份文字稿，最后一次性写盘
+    full_text = ""
+    current = None
+    for segment in transcript_data:
+        speaker_id = segment.get("speaker", "Unknown")
+        speaker_name = speaker_map.get(speaker_id, speaker_id)
+        text = segment.get("text", "").strip()
+        if not text:
+            continue
+        if speaker_name != current:
+            full_text += f"\n\n[{speaker_name}]: "
+            current = speaker_name
+        full_text += text + " "
+    return full_text.strip()
+
+TIMING_REPEATS = 5
+
+def measure(func):
+    # 计时与内存统计分开跑，tracemalloc 本身会拖慢分配密集的代码；计时取多次中的最小值以减少抖动
+    elapsed = float("inf")
+    for _ in range(TIMING_REPEATS):
+        started = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - started)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def main():
+    out_path = os.path.join(tempfile.mkdtemp(), "transcript.txt")
+    print(f"{'句数':>8} {'concat ms':>10} {'concat MB':>10} {'stream ms':>10} {'stream MB':>10} {'ms/千句':>8}")
+    for size in SIZES:
+        data = make_utterances(size)
+        speaker_map = map_speakers(data, HOST, GUEST)
+        concat_time, concat_peak = measure(lambda: write_concat(out_path, data, speaker_map))
+        stream_time, stream_peak = measure(lambda: write_transcript(out_path, iter_blocks(data, speaker_map)))
+        with open(out_path, "r", encoding="utf-8") as f:
+            assert f.read() == build_text_concat(data, speaker_map)
+        print(f"{size:>8} {concat_time * 1000:>10.1f} {concat_peak / 1e6:>10.2f} "
+              f"{stream_time * 1000:>10.1f} {stream_peak / 1e6:>10.2f} {stream_time * 1e6 / size:>8.2f}")
+    # 两者都是线性的：CPython 对唯一引用的字符串 += 会原地扩容，按块生成 dict 的开销使 stream 略慢；
+    # stream 的峰值内存只有每块一个 (start, end) 元组，约为整串拼接的四分之一
+    print("stream 的 ms/千句 基本不随规模变化即为线性")
+
+if __name__ == "__main__":
+    main()
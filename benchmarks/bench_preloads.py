@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.service.scrape_service import extract_preloads_fast, extract_preloads_soup
+
+ROUNDS = 20
+
+def measure(label, func, html):
+    tracemalloc.start()
+    result = func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(html)
+    elapsed = (time.perf_counter() - started) / ROUNDS
+    print(f"{label:<6} {elapsed * 1000:8.2f} ms/次  峰值内存 {peak / 1024 / 1024:6.2f} MB")
+    return result
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(PROJECT_ROOT, "page_content.html")
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    print(f"页面：{path}（{len(html) / 1024:.0f} KB）")
+    soup_result = measure("soup", lambda text: extract_preloads_soup(BeautifulSoup(text, "html.parser")), html)
+    fast_result = measure("fast", extract_preloads_fast, html)
+    print("结果一致" if soup_result == fast_result else "结果不一致！")
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,126 @@
 import os
-import time
 import json
-from src.service.scrape_service import scrape_to_files, slug_from_url
-from src.service.translate_service import translate_file
-from src.config.settings import EPISODES_DIR, EPISODES_CONFIG_PATH
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.service.scrape_service import slug_from_url
+from src.service.episode_pipeline import run_episode_pipeline
+from src.service.metadata_service import build_episode_metadata
+from src.service.episode_index import update_episode_entry, TRANSLATING_STATUS
+from src.service.runtime_stats import log_stats
+from src.infra.translation_cache import evict
+from src.infra.file_watcher import watch_file_changes
+from src.infra.atomic_write import atomic_write
+from src.config.settings import EPISODES_DIR, EPISODES_CONFIG_PATH, EPISODE_CONCURRENCY
 
 CONFIG_PATH = EPISODES_CONFIG_PATH
 BASE_DIR = EPISODES_DIR
 
+# 多个节目并发完成时都会回写 episodes.json，串行化“读-改-写”避免互相覆盖
+_config_lock = threading.Lock()
+# 监听模式下记录每个 url 最近一次看到（或自己写入）的状态，用于比对配置变化
+_known_statuses = {}
+_in_flight = set()
+
 def load_config():
     with open(CONFIG_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
 def save_config(data):
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+    with atomic_write(CONFIG_PATH) as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
+def update_episode_status(url, status, error=None):
+    # 重新读取最新配置再修改，保留处理期间用户对 episodes.json 的其他编辑
+    with _config_lock:
+        data = load_config()
+        for ep in data.get("episodes", []):
+            if ep.get("url") != url:
+                continue
+            ep["status"] = status
+            _known_statuses[url] = status
+            if error:
+                ep["error"] = error
+            else:
+                ep.pop("error", None)
+        save_config(data)
+
 def process_episode(url):
-    slug, input_path = scrape_to_files(url)
-    output_path = os.path.join(BASE_DIR, slug, "transcript_bilingual.txt")
-    translate_file(input_path, output_path)
+    # 每个阶段完成后更新节目索引，Web 服务无需扫描目录即可列出节目及其进度
+    # 抓取与翻译以流水线方式重叠执行，标题翻译等收尾工作也在翻译期间完成
+    slug = slug_from_url(url)
+    ep_dir = os.path.join(BASE_DIR, slug)
+    def on_scraped():
+        # 标题只影响展示，生成失败时记录后继续，不能中断正在进行的正文翻译
+        try:
+            build_episode_metadata(ep_dir)
+        except Exception as e:
+            print(f"生成节目标题失败：{slug}：{e}")
+        # 英文稿已落盘，刷新文件大小与标题；翻译仍在进行，状态保持 translating
+        update_episode_entry(slug, url=url)
+    update_episode_entry(slug, url=url, status=TRANSLATING_STATUS)
+    output_path = os.path.join(ep_dir, "transcript_bilingual.txt")
+    segment_count = run_episode_pipeline(url, ep_dir, output_path, on_scraped)
+    update_episode_entry(slug, url=url, status="completed", segment_count=segment_count)
+    # 写入较少时按写入次数触发的淘汰可能迟迟不执行，节目结束时补做一次过期清理；失败不影响已完成的节目
+    try:
+        evict()
+    except Exception as e:
+        print(f"清理译文缓存失败：{e}")
+    log_stats(slug)
     return True
 
-def run_once():
-    data = load_config()
-    changed = False
-    for ep in data.get("episodes", []):
-        if ep.get("status") != "completed":
-            ok = process_episode(ep["url"])
-            ep["status"] = "completed" if ok else "error"
-            changed = True
-    if changed:
-        save_config(data)
+def process_and_record(url):
+    # 单个节目的异常只记录在该节目上，不影响其他节目继续处理
+    try:
+        ok = process_episode(url)
+    except Exception as e:
+        print(f"节目处理失败：{url}：{e}")
+        update_episode_entry(slug_from_url(url), url=url, status="error")
+        update_episode_status(url, "error", str(e))
+        return
+    update_episode_status(url, "completed" if ok else "error")
+
+def diff_episodes(episodes):
+    # 只返回新增或状态被改动、且尚未完成的节目；自己回写的状态已记录在 _known_statuses 中，不会重复触发
+    changed_urls = []
+    with _config_lock:
+        for ep in episodes:
+            url, status = ep["url"], ep.get("status")
+            if url in _known_statuses and _known_statuses[url] == status:
+                continue
+            _known_statuses[url] = status
+            if status != "completed":
+                changed_urls.append(url)
+    return changed_urls
+
+def _process_tracked(url):
+    try:
+        process_and_record(url)
+    finally:
+        with _config_lock:
+            _in_flight.discard(url)
+
+def enqueue_changed(executor):
+    try:
+        data = load_config()
+    except json.JSONDecodeError as e:
+        print(f"episodes.json 格式错误，等待下一次修改：{e}")
+        return
+    for url in diff_episodes(data.get("episodes", [])):
+        with _config_lock:
+            if url in _in_flight:
+                continue
+            _in_flight.add(url)
+        executor.submit(_process_tracked, url)
 
 def watch_loop():
-    last_mtime = os.path.getmtime(CONFIG_PATH)
-    run_once()
-    while True:
+    with ThreadPoolExecutor(max_workers=EPISODE_CONCURRENCY) as executor:
+        enqueue_changed(executor)
         try:
-            time.sleep(2)
-            mtime = os.path.getmtime(CONFIG_PATH)
-            if mtime != last_mtime:
-                last_mtime = mtime
-                run_once()
+            for _ in watch_file_changes(CONFIG_PATH):
+                enqueue_changed(executor)
         except KeyboardInterrupt:
-            break
+            pass
 
 if __name__ == "__main__":
     if not os.path.exists(BASE_DIR):
@@ -5,6 +5,7 @@ import re
 import sys
 import os
 import argparse
+from src.service.scrape_service import iter_blocks, write_transcript, locate_transcript_http_url
 
 def slug_from_url(url):
     try:
@@ -78,90 +79,17 @@ def scrape_transcript(url, output_file="transcript.txt", save_page_html=False):
     
     print(f"Identified potential speakers - Host: {host_name}, Guest: {guest_name}")
 
-    # Navigate to the transcript URL
-    # Path: post -> podcastUpload -> transcription -> transcript_url
-    transcript_url = None
-    
-    # Try to find transcript URL in the current post
-    if 'post' in data and 'podcastUpload' in data['post']:
-        upload = data['post']['podcastUpload']
-        if upload and 'transcription' in upload:
-             transcript_url = upload['transcription'].get('transcript_url')
-    
-    # If not found directly, look for signed URLs in the data that match the pattern
-    if not transcript_url:
-        print("Transcript URL not found in standard location. Searching recursively...")
-        # Helper to find URLs
-        found_urls = []
-        def find_urls(obj):
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    if isinstance(v, str) and "transcription.json" in v and "http" in v:
-                        found_urls.append(v)
-                    find_urls(v)
-            elif isinstance(obj, list):
-                for item in obj:
-                    find_urls(item)
-        
-        find_urls(data)
-        
-        # Filter for URLs that might belong to the current post (using post ID if possible)
-        # For now, just take the first one if available, or try to match post ID
-        post_id = str(data.get('post', {}).get('id', ''))
-        if found_urls:
-            if post_id:
-                for u in found_urls:
-                    if post_id in u:
-                        transcript_url = u
-                        break
-            if not transcript_url:
-                transcript_url = found_urls[0] # Fallback to first found
-
-    if not transcript_url:
-        print("Could not find any transcript URL in the page data.")
+    # Resolve the transcript URL: standard location first, otherwise search the
+    # preloads tree (preferring this post's ID). The fallback URL and the signed
+    # HTTP URL for an s3:// path are both collected in a single pass.
+    post_id = str(data.get('post', {}).get('id', ''))
+    try:
+        transcript_url = locate_transcript_http_url(data, post_id or None)
+    except RuntimeError as e:
+        print(f"Could not resolve transcript URL: {e}")
         return False
-        
-    print(f"Found transcript URL: {transcript_url}")
-    
-    # The URL might be an s3:// URL which we can't fetch directly without signing
-    # But usually the JSON contains the http version too.
-    # If we only found the s3 URL, we are in trouble unless we found the signed http one.
-    
-    if transcript_url.startswith("s3://"):
-        print("Found S3 URL, searching for HTTP equivalent...")
-        # Search again for HTTP version
-        http_url = None
-        
-        # We know the structure s3://substack-video/video_upload/...
-        # We want https://substackcdn.com/video_upload/...
-        # But we need the signature params.
-        # Let's search specifically for the signed URL corresponding to this S3 path's file name
-        
-        # Extract filename/path part
-        path_part = transcript_url.replace("s3://substack-video/", "")
-        
-        def find_signed_url(obj):
-            if isinstance(obj, dict):
-                for k, v in obj.items():
-                    if isinstance(v, str) and path_part in v and "http" in v:
-                        return v
-                    res = find_signed_url(v)
-                    if res: return res
-            elif isinstance(obj, list):
-                for item in obj:
-                    res = find_signed_url(item)
-                    if res: return res
-            return None
 
-        http_url = find_signed_url(data)
-        
-        if http_url:
-            print(f"Found signed HTTP URL: {http_url}")
-            transcript_url = http_url
-        else:
-            print("Could not find signed HTTP URL for the transcript.")
-            # Last ditch effort: check if there is an 'unaligned_transcription.json' or similar that IS signed
-            return False
+    print(f"Found transcript URL: {transcript_url}")
 
     # Download transcript
     print("Downloading transcript...")
@@ -203,28 +131,9 @@ def scrape_transcript(url, output_file="transcript.txt", save_page_html=False):
         speaker_map["SPEAKER_1"] = host_name
         speaker_map["SPEAKER_0"] = guest_name
 
-    full_text = ""
-    current_speaker = None
-    
-    for segment in transcript_data:
-        speaker_id = segment.get('speaker', 'Unknown')
-        speaker_name = speaker_map.get(speaker_id, speaker_id) # Use mapped name or original ID
-        
-        text = segment.get('text', '').strip()
-        
-        if not text:
-            continue
-            
-        if speaker_name != current_speaker:
-            full_text += f"\n\n[{speaker_name}]: "
-            current_speaker = speaker_name
-        
-        full_text += text + " "
-
-    # Save to file
+    # Stream speaker blocks straight to the file instead of growing one big string
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
-    with open(output_file, 'w') as f:
-        f.write(full_text.strip())
+    write_transcript(output_file, iter_blocks(transcript_data, speaker_map))
     
     print(f"Transcript saved to {output_file}")
     return True
@@ -0,0 +1,155 @@
+import os
+import sys
+import asyncio
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure project root is on sys.path for 'src.*' imports
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+from src.config.settings import GZIP_MIN_BYTES, SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_IO_THREADS
+from src.infra.deepseek_client import translate_text_strict_async
+from src.api.viewer_core import (
+    DEFAULT_TITLE_EN,
+    DEFAULT_TITLE_ZH,
+    list_episodes,
+    default_slug,
+    load_titles,
+    transcript_etag,
+    build_transcript_payload,
+    apply_retranslation,
+)
+from src.service.search_index import search_segments, warm_search_index
+from src.service.runtime_stats import collect_stats
+
+# 与 server.py 相同的接口；LLM 调用走异步客户端，文件读取等阻塞操作放进线程池，
+# 重新翻译进行中时事件循环仍可继续服务其他读者
+
+templates = Jinja2Templates(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates"))
+
+def _number_arg(query, key: str, cast):
+    # 与 Flask 的 args.get(type=...) 一致：缺失或无法转换时返回 None
+    value = query.get(key)
+    if value is None:
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        return None
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == etag:
+            return True
+    return False
+
+async def index(request: Request):
+    eps = await asyncio.to_thread(list_episodes)
+    slug = default_slug(eps)
+    title_en, title_zh = await asyncio.to_thread(load_titles, slug) if slug else (DEFAULT_TITLE_EN, DEFAULT_TITLE_ZH)
+    context = {"title_en": title_en, "title_zh": title_zh, "slug": slug}
+    return templates.TemplateResponse(request, "index.html", context)
+
+async def api_episodes(request: Request):
+    return JSONResponse(await asyncio.to_thread(list_episodes))
+
+async def api_transcript(request: Request):
+    query = request.query_params
+    slug = query.get("slug")
+    if not slug:
+        return JSONResponse([])
+    etag = await asyncio.to_thread(transcript_etag, slug, request.url.query.encode("utf-8"))
+    # GZipMiddleware 会按 Accept-Encoding 压缩同一响应，字节不同但语义相同，因此用弱 ETag
+    headers = {"ETag": f'W/"{etag}"', "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    payload = await asyncio.to_thread(
+        build_transcript_payload, slug,
+        _number_arg(query, "offset", int), _number_arg(query, "limit", int), query.get("fields"),
+        _number_arg(query, "from", float), _number_arg(query, "to", float), _number_arg(query, "at", float))
+    return JSONResponse(payload, headers=headers)
+
+async def api_translate_segment(request: Request):
+    try:
+        payload = await request.json()
+    except ValueError:
+        payload = {}
+    payload = payload if isinstance(payload, dict) else {}
+    english_text = payload.get("text")
+    slug = payload.get("slug")
+    index = payload.get("index")
+    if not english_text or not slug:
+        return JSONResponse({"error": "缺少必要参数"}, status_code=400)
+    try:
+        translation = await translate_text_strict_async(english_text, refresh=True)
+        if isinstance(index, int):
+            await asyncio.to_thread(apply_retranslation, slug, index, translation)
+        return JSONResponse({"translation": translation})
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+async def api_search(request: Request):
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        return JSONResponse({"query": query, "total": 0, "hits": []})
+    # 首次查询或清单变化时需要建索引，放进线程池执行
+    limit = _number_arg(request.query_params, "limit", int)
+    return JSONResponse(await asyncio.to_thread(search_segments, query, limit))
+
+async def api_title(request: Request):
+    slug = request.query_params.get("slug")
+    if not slug:
+        return JSONResponse({"title_en": DEFAULT_TITLE_EN, "title_zh": DEFAULT_TITLE_ZH})
+    title_en, title_zh = await asyncio.to_thread(load_titles, slug)
+    return JSONResponse({"title_en": title_en, "title_zh": title_zh})
+
+async def api_stats(request: Request):
+    # 计数器都在内存中，读取只需短暂持锁，不必放进线程池
+    return JSONResponse(collect_stats())
+
+@asynccontextmanager
+async def lifespan(app):
+    # asyncio.to_thread 使用事件循环的默认线程池；默认大小偏小，大量并发读取时会排队
+    executor = ThreadPoolExecutor(max_workers=SERVER_IO_THREADS, thread_name_prefix="asgi-io")
+    asyncio.get_running_loop().set_default_executor(executor)
+    warm_search_index()
+    yield
+    executor.shutdown(wait=False)
+
+routes = [
+    Route("/", index),
+    Route("/api/episodes", api_episodes),
+    Route("/api/transcript", api_transcript),
+    Route("/api/translate", api_translate_segment, methods=["POST"]),
+    Route("/api/search", api_search),
+    Route("/api/title", api_title),
+    Route("/api/stats", api_stats),
+]
+
+middleware = [
+    Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"]),
+    Middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES),
+]
+
+app = Starlette(routes=routes, middleware=middleware, lifespan=lifespan)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("src.api.asgi_server:app", host=SERVER_HOST, port=SERVER_PORT, workers=SERVER_WORKERS)
@@ -0,0 +1,32 @@
+import os
+import gzip
+import hashlib
+from src.config.settings import GZIP_MIN_BYTES
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html"}
+
+def files_etag(paths: list[str], variant: bytes) -> str:
+    # 以源文件的 (mtime, size) 加请求参数生成 ETag，无需先构造响应体
+    digest = hashlib.sha1(variant)
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode("utf-8"))
+        except FileNotFoundError:
+            digest.update(f"{path}:missing;".encode("utf-8"))
+    return digest.hexdigest()
+
+def gzip_response(response, accept_encoding: str):
+    if "gzip" not in accept_encoding.lower():
+        return response
+    if response.status_code != 200 or response.direct_passthrough or "Content-Encoding" in response.headers:
+        return response
+    if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=6))
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
@@ -0,0 +1,130 @@
+import os
+import time
+from src.config.settings import EPISODES_DIR, EPISODE_INDEX_PATH, TRANSCRIPT_CACHE_MAX_BYTES, TITLE_RETRY_SECONDS
+from src.domain.transcript_format import parse_transcript_segments
+from src.service.translation_journal import journal_path, load_journal, resume_translation
+from src.service.metadata_service import metadata_path, page_path, load_metadata_file, build_episode_metadata
+from src.service.episode_index import load_index_file, rebuild_index, TRANSLATING_STATUS
+from src.service.segment_store import load_segments, edit_log_path, update_segment
+from src.service.search_index import update_search_segment
+from src.service.transcript_query import paginate_segments, project_segment, public_segment, normalize_fields, select_by_time
+from src.service.structured_store import translation_metadata
+from src.service.segment_timeline import load_timestamps, attach_timestamps, timestamps_path
+from src.infra.file_cache import FileBackedLRUCache, file_signature
+from src.api.http_utils import files_etag
+
+# Flask 与 ASGI 两种服务模式共用的读取逻辑；这里只依赖普通参数，不依赖具体 Web 框架
+
+_metadata_cache = FileBackedLRUCache(TRANSCRIPT_CACHE_MAX_BYTES)
+_index_cache = FileBackedLRUCache(TRANSCRIPT_CACHE_MAX_BYTES)
+
+DEFAULT_TITLE_EN = "Lenny's Podcast Transcript"
+DEFAULT_TITLE_ZH = "Lenny的播客成绩单"
+
+def list_episodes():
+    # 节目清单由 episode_manager 维护；这里只 stat 一次索引文件，变化时才重新加载
+    entries = _index_cache.get(EPISODE_INDEX_PATH, load_index_file)
+    if entries is None:
+        entries = rebuild_index()
+    return [
+        dict(entry, has_transcript=entry.get("transcript_bytes") is not None,
+             has_bilingual=entry.get("bilingual_bytes") is not None)
+        for entry in entries
+    ]
+
+def default_slug(eps: list[dict]) -> str | None:
+    # 默认展示第一个已生成双语的节目
+    for e in eps:
+        if e["has_bilingual"]:
+            return e["slug"]
+    return eps[0]["slug"] if eps else None
+
+def _episode_status(slug: str) -> str | None:
+    return next((e.get("status") for e in list_episodes() if e["slug"] == slug), None)
+
+def _base_segments(slug: str, ep_dir: str) -> list[dict] | None:
+    # 已有双语稿（重新处理节目）时以它为底，旧译文继续可见；否则以英文稿为骨架
+    segments = load_segments(slug)
+    if segments:
+        return segments
+    transcript_path = os.path.join(ep_dir, "transcript.txt")
+    if not os.path.exists(transcript_path):
+        return None
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        return parse_transcript_segments(f.read())
+
+def load_partial_bilingual(slug: str):
+    # 存在旁路日志说明翻译进行中或中途退出：把日志里已完成的段落叠加到底稿上；
+    # 只有节目确实处于翻译中时，仍无译文的段落才标记为 pending，前端据此轮询
+    ep_dir = os.path.join(EPISODES_DIR, slug)
+    journal = journal_path(os.path.join(ep_dir, "transcript_bilingual.txt"))
+    if not os.path.exists(journal):
+        return None
+    base = _base_segments(slug, ep_dir)
+    if base is None:
+        return None
+    entries = load_journal(journal)
+    translating = _episode_status(slug) == TRANSLATING_STATUS
+    segments = []
+    for index, seg in enumerate(base):
+        translation = resume_translation(seg, entries.get(index))
+        chinese = seg.get("chinese", "") if translation is None else translation
+        segments.append(dict(seg, chinese=chinese, pending=translating and translation is None and not chinese))
+    return attach_timestamps(segments, load_timestamps(ep_dir))
+
+def _title_needs_retry(ep_dir: str, metadata: dict) -> bool:
+    written = file_signature(metadata_path(ep_dir))
+    if written is None:
+        return True
+    if metadata.get("title_found") is False:
+        # 上次未找到标题：只有页面在那之后被重新抓取才需要再提取
+        page = file_signature(page_path(ep_dir))
+        return page is not None and page[0] > written[0]
+    if metadata.get("title_translated", True):
+        return False
+    # 上次标题翻译失败：metadata.json 的修改时间即失败时间，间隔内不重复请求
+    return time.time_ns() - written[0] >= TITLE_RETRY_SECONDS * 1_000_000_000
+
+def load_titles(slug: str):
+    ep_dir = os.path.join(EPISODES_DIR, slug)
+    metadata = _metadata_cache.get(metadata_path(ep_dir), load_metadata_file)
+    if metadata is None or _title_needs_retry(ep_dir, metadata):
+        # 旧节目没有 metadata.json 或上次标题翻译失败：补建一次，之后的请求直接命中缓存
+        try:
+            metadata = build_episode_metadata(ep_dir) or metadata
+        except Exception as e:
+            print(f"生成节目标题失败：{slug}：{e}")
+    if not metadata or not metadata.get("title_en"):
+        return DEFAULT_TITLE_EN, DEFAULT_TITLE_ZH
+    return metadata["title_en"], metadata["title_zh"]
+
+def transcript_etag(slug: str, query: bytes) -> str:
+    # pending 标记取决于 index.json 中的节目状态：状态变化（如 translating → error）而文件不变时，
+    # ETag 也必须变化，否则客户端会一直拿到 304 并停留在“翻译中”
+    status = _episode_status(slug) or ""
+    return files_etag(transcript_source_paths(slug), query + b"|status=" + status.encode("utf-8"))
+
+def transcript_source_paths(slug: str) -> list[str]:
+    ep_dir = os.path.join(EPISODES_DIR, slug)
+    bilingual_path = os.path.join(ep_dir, "transcript_bilingual.txt")
+    return [bilingual_path, edit_log_path(bilingual_path), journal_path(bilingual_path),
+            os.path.join(ep_dir, "transcript.txt"), timestamps_path(ep_dir)]
+
+def build_transcript_payload(slug: str, offset: int | None, limit: int | None, fields: str | None,
+                             time_from: float | None, time_to: float | None, time_at: float | None):
+    data = load_partial_bilingual(slug)
+    if data is None:
+        data = load_segments(slug)
+    if time_from is not None or time_to is not None or time_at is not None:
+        return select_by_time(slug, data, time_from, time_to, time_at, fields)
+    if offset is None and limit is None:
+        # 不带分页参数时保持原有的整段数组格式
+        if fields is None:
+            return [public_segment(seg) for seg in data]
+        return [project_segment(seg, i, normalize_fields(fields)) for i, seg in enumerate(data)]
+    return paginate_segments(data, offset, limit, fields)
+
+def apply_retranslation(slug: str, index: int, translation: str) -> None:
+    # 写入编辑日志后同步更新检索索引，新译文立即可被搜索到
+    if update_segment(slug, index, translation, translation_metadata()):
+        update_search_segment(slug, index, translation)
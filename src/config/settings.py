@@ -6,3 +6,81 @@ DEEPSEEK_MODEL = os.environ.get("DEEPSEEK_MODEL", "deepseek-chat")
 
 EPISODES_DIR = "episodes"
 EPISODES_CONFIG_PATH = "episodes.json"
+
+# 单个节目翻译时同时进行的 DeepSeek 请求数
+TRANSLATE_CONCURRENCY = 8
+
+# 译文缓存（SQLite），按模型 + 系统提示词 + 原文的哈希寻址
+TRANSLATION_CACHE_PATH = os.path.join(".cache", "translations.sqlite3")
+TRANSLATION_CACHE_MAX_ENTRIES = 200000
+TRANSLATION_CACHE_MAX_AGE_DAYS = 180
+
+# DeepSeek HTTP 连接池：进程内共享一个客户端，保持长连接
+DEEPSEEK_POOL_SIZE = 32
+DEEPSEEK_TIMEOUT_SECONDS = 120
+
+# 多段合并翻译：把连续的短段落按 token 预算打包进同一次请求
+BATCH_TOKEN_BUDGET = 1200
+BATCH_SHORT_SEGMENT_TOKENS = 300
+BATCH_MAX_SEGMENTS = 20
+
+# 超长发言按句子切分后再翻译，每个翻译单元的最大字符数
+MAX_TRANSLATION_UNIT_CHARS = 1500
+
+# DeepSeek 调用的全局限流与重试（进程内共享）
+DEEPSEEK_RATE_LIMIT_PER_SECOND = 10
+DEEPSEEK_RATE_LIMIT_BURST = 20
+DEEPSEEK_MIN_CONCURRENCY = 1
+DEEPSEEK_MAX_CONCURRENCY = 32
+DEEPSEEK_MAX_RETRIES = 5
+DEEPSEEK_RETRY_BASE_SECONDS = 1.0
+DEEPSEEK_RETRY_MAX_SECONDS = 60.0
+
+# episode_manager 同时处理的节目数；每个节目内部再按 TRANSLATE_CONCURRENCY 并发，
+# 所有节目共享 DEEPSEEK_MAX_CONCURRENCY 这一全局上限
+EPISODE_CONCURRENCY = 3
+
+# episodes.json 监听：优先 inotify，不可用时退回轮询；连续写入在去抖窗口内合并为一次
+CONFIG_WATCH_DEBOUNCE_SECONDS = 0.5
+CONFIG_WATCH_POLL_SECONDS = 2
+
+# Web 服务进程内解析结果缓存的容量上限（按源文件字节数计）
+TRANSCRIPT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 标题翻译失败时先以英文标题代替，并在 metadata.json 中记下；超过该间隔后再次访问时重新翻译
+TITLE_RETRY_SECONDS = 600
+
+# 节目索引清单：episode_manager 在每个阶段完成后更新，Web 服务据此列出节目
+EPISODE_INDEX_PATH = os.path.join(EPISODES_DIR, "index.json")
+
+# /api/transcript 分页与压缩
+TRANSCRIPT_PAGE_SIZE_DEFAULT = 50
+TRANSCRIPT_PAGE_SIZE_MAX = 500
+GZIP_MIN_BYTES = 1024
+
+# “重新翻译”写入追加式编辑日志，超过该大小后在后台合并回双语文件
+EDIT_LOG_COMPACT_BYTES = 64 * 1024
+
+# 抓取使用的共享 HTTP 会话：连接池、超时与重试；条件请求的缓存放在各节目目录下
+HTTP_POOL_SIZE = 10
+HTTP_TIMEOUT_SECONDS = 30
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF_SECONDS = 0.5
+HTTP_CACHE_DIRNAME = ".http_cache"
+
+# 抓取→翻译流水线：段落经有界队列直接交给翻译阶段，按窗口分批并发翻译
+PIPELINE_QUEUE_SEGMENTS = 256
+PIPELINE_WINDOW_SEGMENTS = 40
+PIPELINE_TRANSLATE_WINDOWS = 2
+
+# ASGI 服务模式（start_server.sh 默认使用）：监听地址、进程数与阻塞文件读取使用的线程数
+# 多进程时各进程的缓存与 DeepSeek 限流器互相独立，一般保持单进程即可
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 5001
+SERVER_WORKERS = 1
+SERVER_IO_THREADS = 64
+
+# /api/search 跨节目全文检索：默认与最大返回条数、命中片段长度（字符）
+SEARCH_RESULTS_DEFAULT = 20
+SEARCH_RESULTS_MAX = 100
+SEARCH_SNIPPET_CHARS = 160
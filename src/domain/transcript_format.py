@@ -0,0 +1,45 @@
+# 文字稿文本格式的唯一解析/序列化实现：
+#   [Speaker]: English...
+#   (中文): 中文...
+# 英文稿 transcript.txt 是同一格式但没有 (中文) 行
+
+CHINESE_MARKER = "(中文):"
+
+def parse_transcript_segments(transcript_text: str) -> list[dict]:
+    segments = []
+    current = {"speaker": None, "english": "", "chinese": ""}
+    mode = "none"
+    for raw_line in transcript_text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        if line.startswith("[") and "]: " in line:
+            if current["speaker"] or current["english"] or current["chinese"]:
+                current["english"] = current["english"].strip()
+                current["chinese"] = current["chinese"].strip()
+                segments.append(current)
+            speaker = line[1:line.index("]: ")].strip()
+            text = line[line.index("]: ") + 3 :]
+            current = {"speaker": speaker, "english": text, "chinese": ""}
+            mode = "english"
+            continue
+        if line.startswith(CHINESE_MARKER):
+            text = line[len(CHINESE_MARKER):].strip()
+            current["chinese"] = text
+            mode = "chinese"
+            continue
+        if mode == "english":
+            current["english"] += " " + line
+        elif mode == "chinese":
+            current["chinese"] += "\n" + line
+    if current["speaker"] or current["english"] or current["chinese"]:
+        current["english"] = current["english"].strip()
+        current["chinese"] = current["chinese"].strip()
+        segments.append(current)
+    return segments
+
+def format_segment(speaker: str, english: str, chinese: str) -> str:
+    return f"[{speaker}]: {english}\n{CHINESE_MARKER} {chinese}\n\n"
+
+def format_bilingual_text(segments: list[dict]) -> str:
+    return "".join(format_segment(seg["speaker"], seg["english"], seg["chinese"]) for seg in segments)
@@ -0,0 +1,23 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+# 先写临时文件再 os.replace：读者只会看到旧文件或完整的新文件。
+# 临时文件由 mkstemp 在目标目录下生成唯一文件名，多个线程/进程同时写同一目标时
+# 不会互相截断或替换掉对方写了一半的临时文件；同目录保证 replace 不跨文件系统
+TMP_FILE_MODE = 0o644
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", encoding: str | None = "utf-8"):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        # mkstemp 默认 0600，保持与普通 open 创建的文件相同的可读权限
+        os.fchmod(fd, TMP_FILE_MODE)
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        # 写入失败时清理临时文件，原文件保持不变
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -0,0 +1,56 @@
+import os
+import threading
+from collections import OrderedDict
+
+def file_signature(path: str) -> tuple[int, int] | None:
+    # (mtime, size) 足以判断文件是否被替换或追加；文件不存在时返回 None
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+class FileBackedLRUCache:
+    # 缓存“由某个文件解析出的结果”，以 (mtime, size) 判断文件是否变化；
+    # 按源文件字节数限制总容量，超出时淘汰最久未使用的条目
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, loader):
+        signature = file_signature(path)
+        if signature is None:
+            self.invalidate(path)
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # 解析放在锁外，避免一个大文件的解析阻塞其他请求
+        value = loader(path)
+        with self._lock:
+            self._store(path, signature, value)
+        return value
+
+    def _store(self, path: str, signature: tuple[int, int], value) -> None:
+        old = self._entries.pop(path, None)
+        if old:
+            self._total_bytes -= old[0][1]
+        self._entries[path] = (signature, value)
+        self._total_bytes += signature[1]
+        while self._total_bytes > self._max_bytes and len(self._entries) > 1:
+            _, (evicted_signature, _) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_signature[1]
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old:
+                self._total_bytes -= old[0][1]
@@ -0,0 +1,90 @@
+import os
+import time
+import ctypes
+import select
+import struct
+from src.config.settings import CONFIG_WATCH_DEBOUNCE_SECONDS, CONFIG_WATCH_POLL_SECONDS
+from src.infra.file_cache import file_signature
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+# 监听所在目录而不是文件本身：编辑器和原子写入都是“写临时文件再 rename”，文件 inode 会变
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+def _open_inotify(directory: str) -> int | None:
+    try:
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+def _read_event_names(fd: int) -> list[str]:
+    names = []
+    try:
+        buffer = os.read(fd, 65536)
+    except BlockingIOError:
+        return names
+    offset = 0
+    while offset + EVENT_HEADER.size <= len(buffer):
+        _, _, _, name_len = EVENT_HEADER.unpack_from(buffer, offset)
+        start = offset + EVENT_HEADER.size
+        names.append(os.fsdecode(buffer[start:start + name_len].rstrip(b"\0")))
+        offset = start + name_len
+    return names
+
+def _wait_quiet(fd: int, debounce_seconds: float) -> None:
+    # 去抖：目录在一个窗口内不再有新事件才返回，合并一次保存产生的多次写入
+    while True:
+        readable, _, _ = select.select([fd], [], [], debounce_seconds)
+        if not readable:
+            return
+        _read_event_names(fd)
+
+def _inotify_changes(fd: int, filename: str, debounce_seconds: float):
+    try:
+        while True:
+            # 无超时阻塞等待事件，空闲时不占用 CPU
+            select.select([fd], [], [])
+            if filename in _read_event_names(fd):
+                _wait_quiet(fd, debounce_seconds)
+                yield
+    finally:
+        os.close(fd)
+
+def _poll_changes(path: str, debounce_seconds: float, poll_seconds: float):
+    last_signature = file_signature(path)
+    while True:
+        time.sleep(poll_seconds)
+        signature = file_signature(path)
+        if signature == last_signature:
+            continue
+        # 去抖：等文件在一个窗口内保持不变再通知
+        while True:
+            time.sleep(debounce_seconds)
+            settled = file_signature(path)
+            if settled == signature:
+                break
+            signature = settled
+        last_signature = signature
+        yield
+
+def watch_file_changes(path: str, debounce_seconds: float | None = None, poll_seconds: float | None = None):
+    # 每当 path 发生一次（去抖后的）变化就产出一次；调用方自行读取并比对内容
+    debounce = CONFIG_WATCH_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+    poll = CONFIG_WATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+    directory = os.path.dirname(os.path.abspath(path))
+    fd = _open_inotify(directory)
+    if fd is None:
+        return _poll_changes(path, debounce, poll)
+    return _inotify_changes(fd, os.path.basename(path), debounce)
@@ -0,0 +1,124 @@
+import os
+import json
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.infra.atomic_write import atomic_write
+from src.config.settings import (
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT_SECONDS,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF_SECONDS,
+    HTTP_CACHE_DIRNAME,
+)
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "lenny-podcast-trans/1.0",
+}
+
+_session_lock = threading.Lock()
+_session = None
+
+def _build_session() -> requests.Session:
+    # 抓取页面与 transcript JSON 共用一个连接池：同一主机复用 keep-alive 连接，
+    # 连接错误与 429/5xx 由 urllib3 按指数退避重试（遵守 Retry-After）
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=HTTP_RETRY_BACKOFF_SECONDS,
+        status_forcelist=RETRYABLE_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+def set_session(session: requests.Session | None) -> None:
+    # 供测试替换会话（如指向本地桩服务、关闭重试）；传 None 恢复为默认会话
+    global _session
+    with _session_lock:
+        _session = session
+
+def _cache_paths(cache_dir: str, name: str) -> tuple[str, str]:
+    base = os.path.join(cache_dir, HTTP_CACHE_DIRNAME, name)
+    return base + ".body", base + ".meta.json"
+
+def _strip_query(url: str) -> str:
+    return url.split("?")[0]
+
+def _load_cache_entry(cache_dir: str, name: str) -> dict | None:
+    body_path, meta_path = _cache_paths(cache_dir, name)
+    if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        # 元数据损坏时当作没有缓存，下一次完整下载会覆盖它
+        return None
+
+def _read_cached_body(cache_dir: str, name: str) -> bytes:
+    with open(_cache_paths(cache_dir, name)[0], "rb") as f:
+        return f.read()
+
+def _write_atomic(path: str, data: bytes) -> None:
+    with atomic_write(path, "wb") as f:
+        f.write(data)
+
+def _save_cache_entry(cache_dir: str, name: str, url: str, response: requests.Response) -> None:
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    body_path, meta_path = _cache_paths(cache_dir, name)
+    os.makedirs(os.path.dirname(body_path), exist_ok=True)
+    # 先写正文再写元数据：中途失败时元数据仍指向旧正文或不存在，不会错配
+    _write_atomic(body_path, response.content)
+    meta = {"url": url, "etag": etag, "last_modified": last_modified, "encoding": response.encoding}
+    _write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+def _conditional_headers(entry: dict | None, url: str) -> dict:
+    # 签名地址的查询参数每次可能不同，只要路径相同就视为同一资源
+    if not entry or _strip_query(entry.get("url", "")) != _strip_query(url):
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def fetch(url: str, cache_dir: str | None = None, name: str | None = None) -> dict:
+    # 返回 {"content": bytes, "encoding": str | None, "from_cache": bool}
+    # 指定 cache_dir 与 name 时做条件请求：服务端返回 304 直接读本地缓存
+    session = get_session()
+    entry = _load_cache_entry(cache_dir, name) if cache_dir and name else None
+    headers = _conditional_headers(entry, url)
+    response = session.get(url, headers=headers, timeout=HTTP_TIMEOUT_SECONDS)
+    if response.status_code == 304 and headers:
+        return {"content": _read_cached_body(cache_dir, name), "encoding": entry.get("encoding"), "from_cache": True}
+    response.raise_for_status()
+    if cache_dir and name:
+        _save_cache_entry(cache_dir, name, url, response)
+    return {"content": response.content, "encoding": response.encoding, "from_cache": False}
+
+def fetch_text(url: str, cache_dir: str | None = None, name: str | None = None) -> str:
+    result = fetch(url, cache_dir, name)
+    return result["content"].decode(result["encoding"] or "utf-8", errors="replace")
+
+def fetch_json(url: str, cache_dir: str | None = None, name: str | None = None):
+    return json.loads(fetch(url, cache_dir, name)["content"])
@@ -0,0 +1,152 @@
+import time
+import random
+import asyncio
+import threading
+from src.config.settings import (
+    DEEPSEEK_RATE_LIMIT_PER_SECOND,
+    DEEPSEEK_RATE_LIMIT_BURST,
+    DEEPSEEK_MIN_CONCURRENCY,
+    DEEPSEEK_MAX_CONCURRENCY,
+    DEEPSEEK_MAX_RETRIES,
+    DEEPSEEK_RETRY_BASE_SECONDS,
+    DEEPSEEK_RETRY_MAX_SECONDS,
+)
+
+# 同一波并发请求往往一起被限流，冷却期内只减半一次，避免并发数被瞬间压到最低
+DECREASE_COOLDOWN_SECONDS = 1.0
+ASYNC_POLL_SECONDS = 0.05
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # 先预订一个令牌，返回需要等待的秒数；允许令牌为负，等待时间按欠额计算
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self._rate)
+
+class AdaptiveConcurrencyLimiter:
+    # AIMD：成功时并发上限缓慢加一，被限流时减半
+    def __init__(self, min_limit: int, max_limit: int):
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._limit = float(max_limit)
+        self._in_flight = 0
+        self._last_decrease_at = 0.0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        with self._cond:
+            if self._in_flight >= int(self._limit):
+                return False
+            self._in_flight += 1
+            return True
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, is_throttled: bool = False, adjust: bool = True) -> None:
+        # adjust=False 用于取消/中断：只归还并发名额，不把这次调用计入 AIMD 调整
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if adjust and is_throttled:
+                if now - self._last_decrease_at >= DECREASE_COOLDOWN_SECONDS:
+                    self._limit = max(self._min_limit, self._limit / 2)
+                    self._last_decrease_at = now
+            elif adjust:
+                self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {"concurrency_limit": int(self._limit), "in_flight": self._in_flight}
+
+_bucket = TokenBucket(DEEPSEEK_RATE_LIMIT_PER_SECOND, DEEPSEEK_RATE_LIMIT_BURST)
+_limiter = AdaptiveConcurrencyLimiter(DEEPSEEK_MIN_CONCURRENCY, DEEPSEEK_MAX_CONCURRENCY)
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "throttles": 0, "retries": 0, "failures": 0}
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+def backoff_delay(attempt: int) -> float:
+    # 全抖动指数退避：在 [0, base * 2^attempt] 内随机，避免大量请求同时重试
+    return random.uniform(0, min(DEEPSEEK_RETRY_MAX_SECONDS, DEEPSEEK_RETRY_BASE_SECONDS * (2 ** attempt)))
+
+def _next_delay(error: Exception, attempt: int, classify_error) -> tuple[float | None, bool]:
+    # classify_error(error) -> (should_retry, is_throttled, retry_after_seconds)
+    # 返回 (重试前等待秒数，不再重试时为 None；是否被限流)
+    should_retry, is_throttled, retry_after = classify_error(error)
+    if is_throttled:
+        _count("throttles")
+    if not should_retry or attempt >= DEEPSEEK_MAX_RETRIES:
+        _count("failures")
+        return None, is_throttled
+    _count("retries")
+    if retry_after is not None:
+        return min(retry_after, DEEPSEEK_RETRY_MAX_SECONDS), is_throttled
+    return backoff_delay(attempt), is_throttled
+
+def call_with_limits(request_fn, classify_error):
+    attempt = 0
+    while True:
+        time.sleep(_bucket.reserve())
+        _limiter.acquire()
+        _count("requests")
+        is_throttled, finished = False, False
+        try:
+            result = request_fn()
+            finished = True
+            return result
+        except Exception as e:
+            delay, is_throttled = _next_delay(e, attempt, classify_error)
+            finished = True
+            if delay is None:
+                raise
+        finally:
+            # 任何退出路径（成功、异常、KeyboardInterrupt 等）都恰好释放一次名额
+            _limiter.release(is_throttled, adjust=finished)
+        time.sleep(delay)
+        attempt += 1
+
+async def call_with_limits_async(request_fn, classify_error):
+    attempt = 0
+    while True:
+        await asyncio.sleep(_bucket.reserve())
+        while not _limiter.try_acquire():
+            await asyncio.sleep(ASYNC_POLL_SECONDS)
+        _count("requests")
+        is_throttled, finished = False, False
+        try:
+            result = await request_fn()
+            finished = True
+            return result
+        except Exception as e:
+            delay, is_throttled = _next_delay(e, attempt, classify_error)
+            finished = True
+            if delay is None:
+                raise
+        finally:
+            # 协程被取消（CancelledError）时同样归还名额
+            _limiter.release(is_throttled, adjust=finished)
+        await asyncio.sleep(delay)
+        attempt += 1
+
+def limiter_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update(_limiter.snapshot())
+    return stats
@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+# 相同参数的请求同时进行时只真正执行一次：第一个调用者负责执行，
+# 其余调用者等待并共享同一个结果（或同一个异常）
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                is_leader = True
+            else:
+                self.coalesced += 1
+                is_leader = False
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # 先摘除再唤醒：结束之后到达的请求会重新执行，不会拿到过期结果
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._tasks = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, coro_fn):
+        # 上游调用放在独立任务里并用 shield 等待：某个客户端断开取消时，不会连带取消其他等待者
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self._tasks[key] = task
+            self.leaders += 1
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # 所有等待者都已取消时仍取走异常，避免事件循环报告“异常从未被获取”
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._tasks)}
@@ -0,0 +1,96 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from src.config.settings import (
+    TRANSLATION_CACHE_PATH,
+    TRANSLATION_CACHE_MAX_ENTRIES,
+    TRANSLATION_CACHE_MAX_AGE_DAYS,
+)
+
+# 每写入这么多条才做一次淘汰，避免每次写入都扫表
+EVICT_EVERY_PUTS = 500
+
+_lock = threading.Lock()
+_conn = None
+_puts_since_evict = 0
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+def cache_key(model: str, system_prompt: str, text: str) -> str:
+    digest = hashlib.sha256()
+    for part in (model, system_prompt, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        cache_dir = os.path.dirname(TRANSLATION_CACHE_PATH)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        # Web 服务与 episode_manager 是不同进程，WAL 允许它们同时读写同一个缓存文件
+        conn = sqlite3.connect(TRANSLATION_CACHE_PATH, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations(accessed_at)")
+        conn.commit()
+        _conn = conn
+    return _conn
+
+def _max_age_seconds() -> float:
+    return TRANSLATION_CACHE_MAX_AGE_DAYS * 86400
+
+def get_cached(key: str) -> str | None:
+    now = time.time()
+    with _lock:
+        conn = _get_conn()
+        row = conn.execute("SELECT translation, created_at FROM translations WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > _max_age_seconds():
+            _stats["misses"] += 1
+            return None
+        conn.execute("UPDATE translations SET accessed_at = ? WHERE key = ?", (now, key))
+        conn.commit()
+        _stats["hits"] += 1
+        return row[0]
+
+def put_cached(key: str, translation: str) -> None:
+    global _puts_since_evict
+    now = time.time()
+    with _lock:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO translations (key, translation, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, translation, now, now),
+        )
+        conn.commit()
+        _stats["writes"] += 1
+        _puts_since_evict += 1
+        if _puts_since_evict >= EVICT_EVERY_PUTS:
+            _puts_since_evict = 0
+            _evict_locked(conn, now)
+
+def evict() -> int:
+    with _lock:
+        return _evict_locked(_get_conn(), time.time())
+
+def _evict_locked(conn: sqlite3.Connection, now: float) -> int:
+    removed = conn.execute("DELETE FROM translations WHERE created_at < ?", (now - _max_age_seconds(),)).rowcount
+    # 超出条数上限时按最近访问时间淘汰最旧的条目（LRU）
+    removed += conn.execute(
+        "DELETE FROM translations WHERE key IN ("
+        "SELECT key FROM translations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+        (TRANSLATION_CACHE_MAX_ENTRIES,),
+    ).rowcount
+    conn.commit()
+    _stats["evictions"] += removed
+    return removed
+
+def cache_stats() -> dict:
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,77 @@
+import os
+import json
+import time
+import threading
+from src.config.settings import EPISODES_DIR, EPISODE_INDEX_PATH
+from src.infra.atomic_write import atomic_write
+from src.service.metadata_service import metadata_path, load_metadata_file
+
+# episode_manager 处理节目期间的状态；Web 服务只在该状态下把未完成的段落标记为 pending
+TRANSLATING_STATUS = "translating"
+
+_index_lock = threading.Lock()
+
+def load_index_file(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("episodes", [])
+
+def _read_index() -> list[dict]:
+    if not os.path.exists(EPISODE_INDEX_PATH):
+        return []
+    return load_index_file(EPISODE_INDEX_PATH)
+
+def _write_index(entries: list[dict]) -> None:
+    os.makedirs(os.path.dirname(EPISODE_INDEX_PATH), exist_ok=True)
+    with atomic_write(EPISODE_INDEX_PATH) as f:
+        json.dump({"episodes": entries}, f, ensure_ascii=False, indent=2)
+
+def _file_size(path: str) -> int | None:
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return None
+
+def collect_episode_files(slug: str) -> dict:
+    ep_dir = os.path.join(EPISODES_DIR, slug)
+    fields = {
+        "transcript_bytes": _file_size(os.path.join(ep_dir, "transcript.txt")),
+        "bilingual_bytes": _file_size(os.path.join(ep_dir, "transcript_bilingual.txt")),
+    }
+    if os.path.exists(metadata_path(ep_dir)):
+        metadata = load_metadata_file(metadata_path(ep_dir))
+        fields["title_en"] = metadata.get("title_en")
+        fields["title_zh"] = metadata.get("title_zh")
+    return fields
+
+def update_episode_entry(slug: str, **fields) -> dict:
+    # 读-改-写整个清单；新节目追加到末尾，列表顺序即入库顺序
+    with _index_lock:
+        entries = _read_index()
+        entry = next((e for e in entries if e["slug"] == slug), None)
+        now = time.time()
+        if entry is None:
+            entry = {"slug": slug, "created_at": now}
+            entries.append(entry)
+        entry.update(collect_episode_files(slug))
+        entry.update(fields)
+        entry["updated_at"] = now
+        _write_index(entries)
+        return dict(entry)
+
+def rebuild_index() -> list[dict]:
+    # 清单缺失时（如旧数据目录）扫描一次目录重建，之后只做增量更新
+    with _index_lock:
+        entries = []
+        if os.path.exists(EPISODES_DIR):
+            for slug in os.listdir(EPISODES_DIR):
+                ep_dir = os.path.join(EPISODES_DIR, slug)
+                if not os.path.isdir(ep_dir):
+                    continue
+                created_at = os.stat(ep_dir).st_mtime
+                entry = {"slug": slug, "created_at": created_at, "updated_at": created_at}
+                entry.update(collect_episode_files(slug))
+                entry["status"] = "completed" if entry["bilingual_bytes"] is not None else "scraped"
+                entries.append(entry)
+        entries.sort(key=lambda e: e["created_at"])
+        _write_index(entries)
+        return entries
@@ -0,0 +1,71 @@
+import queue
+import threading
+from src.domain.transcript_format import parse_transcript_segments
+from src.service.scrape_service import scrape_to_files, format_block
+from src.service.translate_service import translate_stream
+from src.config.settings import PIPELINE_QUEUE_SEGMENTS, PIPELINE_WINDOW_SEGMENTS
+
+# 抓取阶段与翻译阶段之间的有界队列：段落生成后直接交给翻译，不再写盘后重新读取解析
+_DONE = object()
+_PUT_POLL_SECONDS = 0.5
+
+class _PipelineStopped(Exception):
+    pass
+
+def _put(segment_queue: queue.Queue, item, stop: threading.Event) -> None:
+    # 队列满时阻塞等待翻译阶段消费；翻译阶段已退出时不能永远卡住，需要定期检查 stop
+    while True:
+        if stop.is_set():
+            raise _PipelineStopped()
+        try:
+            segment_queue.put(item, timeout=_PUT_POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+
+def _scrape_stage(url: str, ep_dir: str, segment_queue: queue.Queue, stop: threading.Event, on_scraped) -> None:
+    def push(block: dict) -> None:
+        # 按块解析与整份英文稿解析结果一致：每块都以 [Speaker]: 行开头
+        for seg in parse_transcript_segments(format_block(block)):
+            _put(segment_queue, seg, stop)
+    try:
+        scrape_to_files(url, ep_dir, on_block=push)
+        if on_scraped:
+            on_scraped()
+        _put(segment_queue, _DONE, stop)
+    except _PipelineStopped:
+        return
+    except BaseException as e:
+        # 异常交给翻译阶段在主线程抛出，由调用方统一记录
+        try:
+            _put(segment_queue, e, stop)
+        except _PipelineStopped:
+            return
+
+def _iter_windows(segment_queue: queue.Queue, window_size: int):
+    window = []
+    while True:
+        item = segment_queue.get()
+        if item is _DONE:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        window.append(item)
+        if len(window) >= window_size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+def run_episode_pipeline(url: str, ep_dir: str, output_path: str, on_scraped=None, max_workers: int | None = None) -> int:
+    # 抓取在后台线程中边生成段落边入队，当前线程按窗口取出并发翻译；
+    # on_scraped 在英文稿与时间戳落盘后于抓取线程调用，与翻译同时进行
+    segment_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SEGMENTS)
+    stop = threading.Event()
+    producer = threading.Thread(target=_scrape_stage, args=(url, ep_dir, segment_queue, stop, on_scraped), daemon=True)
+    producer.start()
+    try:
+        return translate_stream(_iter_windows(segment_queue, PIPELINE_WINDOW_SEGMENTS), output_path, max_workers)
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,54 @@
+import os
+import re
+import json
+import html as html_lib
+from src.infra.deepseek_client import translate_text_strict
+from src.infra.atomic_write import atomic_write
+
+METADATA_FILENAME = "metadata.json"
+PAGE_FILENAME = "page_content.html"
+# 只需要 <title>，用正则直接定位，不必对整页做 HTML 解析
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+def metadata_path(ep_dir: str) -> str:
+    return os.path.join(ep_dir, METADATA_FILENAME)
+
+def page_path(ep_dir: str) -> str:
+    return os.path.join(ep_dir, PAGE_FILENAME)
+
+def extract_title(page_html: str) -> str | None:
+    m = TITLE_PATTERN.search(page_html)
+    if not m:
+        return None
+    title = html_lib.unescape(m.group(1)).strip()
+    return title or None
+
+def load_metadata_file(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_metadata(ep_dir: str, metadata: dict) -> None:
+    with atomic_write(metadata_path(ep_dir)) as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+def build_episode_metadata(ep_dir: str) -> dict | None:
+    # 入库时提取并翻译一次标题，之后 Web 服务只读取 metadata.json
+    if not os.path.isdir(ep_dir):
+        return None
+    title_en = None
+    if os.path.exists(page_path(ep_dir)):
+        with open(page_path(ep_dir), "r", encoding="utf-8") as f:
+            title_en = extract_title(f.read())
+    if not title_en:
+        # 页面缺失或没有 <title> 也写下结果：之后的请求只需 stat 一次，不必反复读取整页
+        metadata = {"title_en": None, "title_zh": None, "title_found": False}
+        write_metadata(ep_dir, metadata)
+        return metadata
+    try:
+        metadata = {"title_en": title_en, "title_zh": translate_text_strict(title_en)}
+    except Exception as e:
+        # 标题只影响展示：翻译失败时暂用英文标题并记下，之后再重新翻译，不阻塞正文处理
+        print(f"翻译节目标题失败，暂用英文标题：{title_en}：{e}")
+        metadata = {"title_en": title_en, "title_zh": title_en, "title_translated": False}
+    write_metadata(ep_dir, metadata)
+    return metadata
@@ -0,0 +1,60 @@
+TRANSCRIPTION_MARKER = "transcription.json"
+S3_PREFIX = "s3://substack-video/"
+
+def _iter_children(obj):
+    # 与原递归实现一致：只检查字典的字符串值，列表中的字符串不参与匹配
+    if isinstance(obj, dict):
+        return ((value, True) for value in obj.values())
+    return ((value, False) for value in obj)
+
+def _is_done(index: dict, signed_path: str | None, want_transcription: bool, post_id: str | None) -> bool:
+    if signed_path and index["signed_url"] is None:
+        return False
+    if not want_transcription:
+        return True
+    urls = index["transcription_urls"]
+    if post_id:
+        return any(post_id in url for url in urls[-1:])
+    return bool(urls)
+
+def build_preloads_index(data, signed_path: str | None = None, want_transcription: bool = True,
+                         post_id: str | None = None) -> dict:
+    # 一次迭代式深度优先遍历（先序，顺序与原递归一致），同时收集：
+    #   transcription_urls：含 transcription.json 的 http 地址（按出现顺序）
+    #   signed_url：第一个包含 signed_path 的 http 地址
+    # 所需结果都已找到时立即停止；使用显式栈，不受递归深度限制
+    index = {"transcription_urls": [], "signed_url": None}
+    if _is_done(index, signed_path, want_transcription, post_id):
+        return index
+    stack = [_iter_children(data)]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        value, from_dict = item
+        if isinstance(value, (dict, list)):
+            stack.append(_iter_children(value))
+            continue
+        if not (from_dict and isinstance(value, str) and "http" in value):
+            continue
+        if want_transcription and TRANSCRIPTION_MARKER in value:
+            index["transcription_urls"].append(value)
+        if signed_path and index["signed_url"] is None and signed_path in value:
+            index["signed_url"] = value
+        if _is_done(index, signed_path, want_transcription, post_id):
+            break
+    return index
+
+def pick_transcription_url(index: dict, post_id: str | None = None) -> str | None:
+    urls = index["transcription_urls"]
+    if post_id:
+        for url in urls:
+            if post_id in url:
+                return url
+    return urls[0] if urls else None
+
+def signed_path_for(transcript_url: str) -> str | None:
+    if not transcript_url.startswith("s3://"):
+        return None
+    return transcript_url.replace(S3_PREFIX, "")
@@ -0,0 +1,13 @@
+import json
+from src.infra.rate_limiter import limiter_stats
+from src.infra.translation_cache import cache_stats
+from src.infra.deepseek_client import single_flight_stats
+
+# 运行期计数器按进程独立：Web 服务通过 /api/stats 只读查看，episode_manager 在每个节目结束时打印
+
+def collect_stats() -> dict:
+    return {"rate_limiter": limiter_stats(), "translation_cache": cache_stats(),
+            "single_flight": single_flight_stats()}
+
+def log_stats(label: str) -> None:
+    print(f"运行统计（{label}）：{json.dumps(collect_stats(), ensure_ascii=False)}")
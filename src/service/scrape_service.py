@@ -1,9 +1,12 @@
 import os
 import re
 import json
-import requests
 from bs4 import BeautifulSoup
 from src.config.settings import EPISODES_DIR
+from src.infra.http_client import fetch_text, fetch_json
+from src.infra.atomic_write import atomic_write
+from src.service.segment_timeline import write_timestamps
+from src.service.preloads_index import build_preloads_index, pick_transcription_url, signed_path_for
 
 def slug_from_url(url: str) -> str:
     path = url.split("?")[0]
@@ -14,70 +17,70 @@ def slug_from_url(url: str) -> str:
             return parts[idx + 1]
     return parts[-1] if parts else "episode"
 
-def fetch_page(url: str) -> str:
-    r = requests.get(url)
-    r.raise_for_status()
-    return r.text
+def fetch_page(url: str, cache_dir: str | None = None) -> str:
+    # 传入节目目录时做条件请求，页面未变化只需一次 304
+    return fetch_text(url, cache_dir, "page")
 
-def extract_preloads(soup: BeautifulSoup):
+PRELOADS_MARKER = "window._preloads"
+PRELOADS_PATTERN = re.compile(r'window\._preloads\s*=\s*JSON\.parse\("(.+?)"\)')
+
+def _decode_preloads(raw: str):
+    unescaped = raw.encode('utf-8').decode('unicode_escape')
+    return json.loads(unescaped)
+
+def extract_preloads_fast(html: str):
+    # 直接在原始 HTML 中定位 window._preloads，只解码这一段，不构建整页 DOM
+    start = html.find(PRELOADS_MARKER)
+    while start != -1:
+        m = PRELOADS_PATTERN.match(html, start)
+        if m:
+            try:
+                return _decode_preloads(m.group(1))
+            except Exception:
+                pass
+        start = html.find(PRELOADS_MARKER, start + len(PRELOADS_MARKER))
+    return None
+
+def extract_preloads_soup(soup: BeautifulSoup):
     scripts = soup.find_all('script')
     for script in scripts:
         if script.string and "window._preloads" in script.string:
-            m = re.search(r'window\._preloads\s*=\s*JSON\.parse\("(.+?)"\)', script.string)
+            m = PRELOADS_PATTERN.search(script.string)
             if m:
-                raw = m.group(1)
                 try:
-                    unescaped = raw.encode('utf-8').decode('unicode_escape')
-                    return json.loads(unescaped)
+                    return _decode_preloads(m.group(1))
                 except Exception:
                     continue
     return None
 
-def find_transcript_url(data: dict) -> str:
-    url = None
+def extract_preloads(html: str):
+    data = extract_preloads_fast(html)
+    if data is not None:
+        return data
+    # 页面结构变化导致快速路径失效时，退回完整 HTML 解析
+    return extract_preloads_soup(BeautifulSoup(html, 'html.parser'))
+
+def direct_transcript_url(data: dict) -> str | None:
     if 'post' in data and 'podcastUpload' in data['post']:
         upload = data['post']['podcastUpload']
         if upload and 'transcription' in upload:
-            url = upload['transcription'].get('transcript_url')
-    if url:
-        return url
-    found_urls = []
-    def walk(obj):
-        if isinstance(obj, dict):
-            for _, v in obj.items():
-                if isinstance(v, str) and "transcription.json" in v and "http" in v:
-                    found_urls.append(v)
-                walk(v)
-        elif isinstance(obj, list):
-            for item in obj:
-                walk(item)
-    walk(data)
-    if found_urls:
-        return found_urls[0]
+            return upload['transcription'].get('transcript_url')
     return None
 
-def resolve_signed_http(transcript_url: str, data: dict) -> str:
-    if not transcript_url.startswith("s3://"):
-        return transcript_url
-    path_part = transcript_url.replace("s3://substack-video/", "")
-    def find_signed(obj):
-        if isinstance(obj, dict):
-            for _, v in obj.items():
-                if isinstance(v, str) and path_part in v and "http" in v:
-                    return v
-                res = find_signed(v)
-                if res:
-                    return res
-        elif isinstance(obj, list):
-            for item in obj:
-                res = find_signed(item)
-                if res:
-                    return res
-        return None
-    http_url = find_signed(data)
-    if not http_url:
+def locate_transcript_http_url(data: dict, post_id: str | None = None) -> str:
+    # 先取固定位置的 transcript_url，再用一次遍历同时找回退地址和签名地址；
+    # 传入 post_id 时回退地址优先匹配当前节目
+    direct = direct_transcript_url(data)
+    signed_path = signed_path_for(direct) if direct else None
+    index = build_preloads_index(data, signed_path=signed_path, want_transcription=direct is None, post_id=post_id)
+    raw_url = direct or pick_transcription_url(index, post_id)
+    if not raw_url:
+        raise RuntimeError("未找到 transcript URL")
+    if not signed_path_for(raw_url):
+        return raw_url
+    if not index["signed_url"]:
         raise RuntimeError("未找到已签名的 HTTP transcript URL")
-    return http_url
+    return index["signed_url"]
 
 def detect_speakers(data: dict) -> tuple[str, str]:
     host = "Host"
@@ -94,14 +97,11 @@ def detect_speakers(data: dict) -> tuple[str, str]:
                 guest = parts[-1].strip()
     return host, guest
 
-def download_transcript_json(http_url: str) -> list[dict]:
-    r = requests.get(http_url)
-    r.raise_for_status()
-    return r.json()
+def download_transcript_json(http_url: str, cache_dir: str | None = None) -> list[dict]:
+    return fetch_json(http_url, cache_dir, "transcript")
 
-def build_text(transcript_data: list[dict], host_name: str, guest_name: str) -> str:
+def map_speakers(transcript_data: list[dict], host_name: str, guest_name: str) -> dict:
     speaker_map = {}
-    found_intro = False
     for segment in transcript_data[:20]:
         text = segment.get('text', '').lower()
         speaker = segment.get('speaker')
@@ -109,49 +109,80 @@ def build_text(transcript_data: list[dict], host_name: str, guest_name: str) ->
             speaker_map[speaker] = host_name
             other_id = "SPEAKER_0" if speaker == "SPEAKER_1" else "SPEAKER_1"
             speaker_map[other_id] = guest_name
-            found_intro = True
-            break
-    if not found_intro:
-        speaker_map["SPEAKER_1"] = host_name
-        speaker_map["SPEAKER_0"] = guest_name
-    full_text = ""
-    current_speaker = None
+            return speaker_map
+    speaker_map["SPEAKER_1"] = host_name
+    speaker_map["SPEAKER_0"] = guest_name
+    return speaker_map
+
+def iter_blocks(transcript_data: list[dict], speaker_map: dict):
+    # 同一说话人的连续发言合并为一个块，保留首句的 start 与末句的 end
+    # 生成器：说话人切换时才产出上一个块，调用方可以边生成边写盘
+    # 逐句循环里只读写局部变量，块结束时才构造 dict，这是抓取阶段最热的循环
+    speaker = texts = start = end = None
     for segment in transcript_data:
-        speaker_id = segment.get('speaker', 'Unknown')
-        speaker_name = speaker_map.get(speaker_id, speaker_id)
         text = segment.get('text', '').strip()
         if not text:
             continue
-        if speaker_name != current_speaker:
-            full_text += f"\n\n[{speaker_name}]: "
-            current_speaker = speaker_name
-        full_text += text + " "
-    return full_text.strip()
+        speaker_id = segment.get('speaker', 'Unknown')
+        speaker_name = speaker_map.get(speaker_id, speaker_id)
+        if texts is None or speaker_name != speaker:
+            if texts is not None:
+                yield {"speaker": speaker, "texts": texts, "start": start, "end": end}
+            speaker, texts, start, end = speaker_name, [], segment.get('start'), None
+        texts.append(text)
+        end = segment.get('end', end)
+    if texts is not None:
+        yield {"speaker": speaker, "texts": texts, "start": start, "end": end}
 
-def scrape_to_files(url: str, out_dir: str | None = None) -> tuple[str, str]:
-    slug = slug_from_url(url)
-    if not out_dir:
-        out_dir = os.path.join(EPISODES_DIR, slug)
-    os.makedirs(out_dir, exist_ok=True)
+def format_block(block: dict) -> str:
+    return f"[{block['speaker']}]: " + " ".join(block["texts"])
+
+def write_transcript(path: str, blocks) -> list[tuple]:
+    # 块逐个直接写入临时文件，文字稿本身不在内存中拼接；每块只留下一个 (start, end) 元组
+    # 供 timestamps.json 使用，这部分仍随块数线性增长。块之间空一行、末尾不留空格，
+    # 与原先逐句拼接后 strip 的结果一致；写完再原子替换，读者不会看到只写了一半的英文稿
+    timestamps = []
+    record = timestamps.append
+    with atomic_write(path) as f:
+        write = f.write
+        separator = ""
+        for block in blocks:
+            write(separator)
+            write(format_block(block))
+            separator = " \n\n"
+            record((block.get("start"), block.get("end")))
+    return timestamps
 
-    html = fetch_page(url)
-    soup = BeautifulSoup(html, 'html.parser')
-    data = extract_preloads(soup)
+def fetch_episode_blocks(url: str, out_dir: str):
+    # 网络请求在这里同步完成（出错立即抛出），返回按说话块产出的生成器
+    html = fetch_page(url, cache_dir=out_dir)
+    data = extract_preloads(html)
     if not data:
         raise RuntimeError("页面中未找到 window._preloads 数据")
     with open(os.path.join(out_dir, "page_content.html"), "w", encoding="utf-8") as pf:
         pf.write(html)
 
-    raw_url = find_transcript_url(data)
-    if not raw_url:
-        raise RuntimeError("未找到 transcript URL")
-    http_url = resolve_signed_http(raw_url, data)
-    t_data = download_transcript_json(http_url)
+    http_url = locate_transcript_http_url(data)
+    t_data = download_transcript_json(http_url, cache_dir=out_dir)
     host_name, guest_name = detect_speakers(data)
-    text = build_text(t_data, host_name, guest_name)
+    return iter_blocks(t_data, map_speakers(t_data, host_name, guest_name))
+
+def _tap_blocks(blocks, on_block):
+    for block in blocks:
+        on_block(block)
+        yield block
 
+def scrape_to_files(url: str, out_dir: str | None = None, on_block=None) -> tuple[str, str]:
+    # on_block 在每个说话块写盘的同时被调用，流水线据此把段落直接交给翻译阶段
+    slug = slug_from_url(url)
+    if not out_dir:
+        out_dir = os.path.join(EPISODES_DIR, slug)
+    os.makedirs(out_dir, exist_ok=True)
+
+    blocks = fetch_episode_blocks(url, out_dir)
+    if on_block:
+        blocks = _tap_blocks(blocks, on_block)
     transcript_path = os.path.join(out_dir, "transcript.txt")
-    with open(transcript_path, "w", encoding="utf-8") as f:
-        f.write(text)
+    timestamps = write_transcript(transcript_path, blocks)
+    write_timestamps(out_dir, timestamps)
     return slug, transcript_path
-
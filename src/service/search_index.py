@@ -0,0 +1,202 @@
+import os
+import re
+import math
+import heapq
+import threading
+from collections import Counter, defaultdict
+from src.config.settings import EPISODES_DIR, EPISODE_INDEX_PATH, SEARCH_SNIPPET_CHARS, SEARCH_RESULTS_DEFAULT, SEARCH_RESULTS_MAX
+from src.service.episode_index import load_index_file, rebuild_index
+from src.service.segment_store import load_segments, bilingual_path, edit_log_path
+from src.infra.file_cache import file_signature
+
+# 跨节目的全文检索：英文按单词、中文按相邻两字（bigram）建立倒排索引，BM25 排序。
+# 索引常驻内存，查询不读文件；节目清单 index.json 变化时只重建有变化的节目，
+# 本进程内的“重新翻译”通过 update_segment_text 直接更新对应段落
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+CJK_CHAR = r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]"
+# 重叠的相邻两字用前瞻一次取出；前后都不是汉字的单字单独成词，避免单字词查不到
+CJK_BIGRAM_PATTERN = re.compile(f"(?=({CJK_CHAR}{{2}}))")
+CJK_SINGLE_PATTERN = re.compile(f"(?<!{CJK_CHAR}){CJK_CHAR}(?!{CJK_CHAR})")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def _cjk_tokens(text: str) -> list[str]:
+    return CJK_BIGRAM_PATTERN.findall(text) + CJK_SINGLE_PATTERN.findall(text)
+
+def tokenize(text: str) -> list[str]:
+    # 分词全部交给正则在 C 层完成，建索引时这是主要开销
+    return WORD_PATTERN.findall(text.lower()) + _cjk_tokens(text)
+
+def tokenize_segment(seg: dict) -> list[str]:
+    # 英文栏只取单词、中文栏只取汉字 n-gram：译文里保留的英文人名/术语在英文栏里已经出现过
+    return WORD_PATTERN.findall(seg.get("english", "").lower()) + _cjk_tokens(seg.get("chinese", ""))
+
+def _episode_signature(slug: str) -> tuple:
+    path = bilingual_path(slug)
+    return file_signature(path), file_signature(edit_log_path(path))
+
+class SearchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(dict)  # term -> {doc_id: tf}
+        self._docs = {}          # doc_id -> (slug, index, segment, term_counts, length)
+        self._doc_ids = {}       # (slug, index) -> doc_id
+        self._episode_docs = {}  # slug -> [doc_id]
+        self._signatures = {}    # slug -> 建索引时的文件签名
+        self._next_id = 0
+        self._total_length = 0
+
+    def _add_doc(self, slug: str, index: int, seg: dict) -> None:
+        counts = Counter(tokenize_segment(seg))
+        doc_id = self._next_id
+        self._next_id += 1
+        length = sum(counts.values())
+        self._docs[doc_id] = (slug, index, seg, counts, length)
+        self._doc_ids[(slug, index)] = doc_id
+        self._episode_docs.setdefault(slug, []).append(doc_id)
+        self._total_length += length
+        postings = self._postings
+        for term, tf in counts.items():
+            postings[term][doc_id] = tf
+
+    def _remove_doc(self, doc_id: int) -> None:
+        slug, index, _, counts, length = self._docs.pop(doc_id)
+        self._doc_ids.pop((slug, index), None)
+        self._total_length -= length
+        for term in counts:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+
+    def remove_episode(self, slug: str) -> None:
+        with self._lock:
+            for doc_id in self._episode_docs.pop(slug, []):
+                self._remove_doc(doc_id)
+            self._signatures.pop(slug, None)
+
+    def index_episode(self, slug: str) -> int:
+        # 先在锁外读取与解析，替换时才持锁，查询不会被文件读取阻塞
+        signature = _episode_signature(slug)
+        segments = load_segments(slug)
+        with self._lock:
+            self.remove_episode(slug)
+            for index, seg in enumerate(segments):
+                self._add_doc(slug, index, seg)
+            self._signatures[slug] = signature
+        return len(segments)
+
+    def update_segment_text(self, slug: str, index: int, chinese: str) -> None:
+        with self._lock:
+            doc_id = self._doc_ids.get((slug, index))
+            if doc_id is None:
+                return
+            seg = dict(self._docs[doc_id][2], chinese=chinese)
+            self._remove_doc(doc_id)
+            self._episode_docs[slug].remove(doc_id)
+            self._add_doc(slug, index, seg)
+            # 编辑日志已由本进程写入，记下新签名避免下次同步时整集重建
+            self._signatures[slug] = _episode_signature(slug)
+
+    def sync(self, slugs: list[str]) -> None:
+        # 只重建文件签名变化的节目，并移除已不在清单中的节目
+        with self._lock:
+            stale = set(self._episode_docs) - set(slugs)
+            known = dict(self._signatures)
+        for slug in stale:
+            self.remove_episode(slug)
+        for slug in slugs:
+            signature = _episode_signature(slug)
+            if signature[0] is None:
+                self.remove_episode(slug)
+            elif known.get(slug) != signature:
+                self.index_episode(slug)
+
+    def _score(self, terms: list[str]) -> dict[int, tuple[int, float]]:
+        doc_count = len(self._docs)
+        average_length = self._total_length / doc_count if doc_count else 0
+        scores = {}
+        for term in set(terms):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                length = self._docs[doc_id][4]
+                norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+                matched, score = scores.get(doc_id, (0, 0.0))
+                scores[doc_id] = (matched + 1, score + idf * norm)
+        return scores
+
+    def search(self, query: str, limit: int) -> dict:
+        # 命中查询词数多的段落优先，其次按 BM25 得分
+        terms = tokenize(query)
+        with self._lock:
+            scores = self._score(terms)
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            hits = [_format_hit(self._docs[doc_id], score, terms) for doc_id, (_, score) in top]
+        return {"query": query, "total": len(scores), "hits": hits}
+
+def _snippet(text: str, terms: list[str]) -> str:
+    lowered = text.lower()
+    positions = [pos for pos in (lowered.find(term) for term in terms) if pos >= 0]
+    if len(text) <= SEARCH_SNIPPET_CHARS:
+        return text
+    start = max(0, min(positions) - SEARCH_SNIPPET_CHARS // 4) if positions else 0
+    snippet = text[start:start + SEARCH_SNIPPET_CHARS]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + SEARCH_SNIPPET_CHARS < len(text) else ""
+    return prefix + snippet + suffix
+
+def _format_hit(doc: tuple, score: float, terms: list[str]) -> dict:
+    slug, index, seg, _, _ = doc
+    return {
+        "slug": slug,
+        "index": index,
+        "speaker": seg.get("speaker"),
+        "english": _snippet(seg.get("english", ""), terms),
+        "chinese": _snippet(seg.get("chinese", ""), terms),
+        "score": round(score, 4),
+    }
+
+_index = SearchIndex()
+_manifest_signature = None
+_manifest_lock = threading.Lock()
+
+def _episode_slugs() -> list[str]:
+    if os.path.exists(EPISODE_INDEX_PATH):
+        entries = load_index_file(EPISODE_INDEX_PATH)
+    else:
+        entries = rebuild_index()
+    return [entry["slug"] for entry in entries if os.path.isdir(os.path.join(EPISODES_DIR, entry["slug"]))]
+
+def refresh_search_index() -> None:
+    # episode_manager 在其他进程中完成节目后会更新 index.json；
+    # 每次查询只 stat 一次清单文件，变化时才逐个节目比对签名
+    global _manifest_signature
+    with _manifest_lock:
+        signature = file_signature(EPISODE_INDEX_PATH)
+        if signature is not None and signature == _manifest_signature:
+            return
+        _index.sync(_episode_slugs())
+        # 清单缺失时 rebuild_index 会新建它，记录新建后的签名
+        _manifest_signature = signature or file_signature(EPISODE_INDEX_PATH)
+
+def search_segments(query: str, limit: int | None = None) -> dict:
+    refresh_search_index()
+    return _index.search(query, min(SEARCH_RESULTS_MAX, max(1, limit or SEARCH_RESULTS_DEFAULT)))
+
+def update_search_segment(slug: str, index: int, chinese: str) -> None:
+    _index.update_segment_text(slug, index, chinese)
+
+def warm_search_index() -> None:
+    # 服务启动时在后台预先建好索引，第一次查询不必等待全量构建
+    def build() -> None:
+        try:
+            refresh_search_index()
+        except Exception as e:
+            print(f"预建检索索引失败，将在首次查询时重试：{e}")
+    threading.Thread(target=build, daemon=True).start()
@@ -0,0 +1,84 @@
+import re
+from src.infra.deepseek_client import translate_text_strict, translate_batch_strict, classify_error
+from src.config.settings import BATCH_TOKEN_BUDGET, BATCH_SHORT_SEGMENT_TOKENS, BATCH_MAX_SEGMENTS
+
+MARKER_PATTERN = re.compile(r"^<<<(\d+)>>>\s*$", re.MULTILINE)
+
+def estimate_tokens(text: str) -> int:
+    # 英文约 4 个字符 1 个 token；只用于打包决策，不需要精确
+    return len(text) // 4 + 1
+
+def plan_batches(texts: list[str]) -> list[list[int]]:
+    # 只合并相邻的短段落；长段落单独成批，避免一次请求的输出过长
+    batches = []
+    current = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        is_short = tokens <= BATCH_SHORT_SEGMENT_TOKENS
+        fits = current_tokens + tokens <= BATCH_TOKEN_BUDGET and len(current) < BATCH_MAX_SEGMENTS
+        if current and (not is_short or not fits):
+            batches.append(current)
+            current, current_tokens = [], 0
+        if not is_short:
+            batches.append([index])
+            continue
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+def format_batch(texts: list[str]) -> str:
+    return "\n".join(f"<<<{number}>>>\n{text}" for number, text in enumerate(texts, start=1))
+
+def split_batch_response(response: str, expected_count: int) -> list[str] | None:
+    # 编号必须恰好是 1..n 且每段非空，否则视为拆分失败
+    markers = list(MARKER_PATTERN.finditer(response))
+    numbers = [int(m.group(1)) for m in markers]
+    if numbers != list(range(1, expected_count + 1)):
+        return None
+    parts = []
+    for position, marker in enumerate(markers):
+        end = markers[position + 1].start() if position + 1 < len(markers) else len(response)
+        part = response[marker.end():end].strip()
+        if not part:
+            return None
+        parts.append(part)
+    return parts
+
+class PartialBatchError(Exception):
+    # 逐段退回后仍有段落失败：translations 中失败的位置为 None，调用方只把这些段落记为失败
+    def __init__(self, translations: list[str | None], error: Exception):
+        super().__init__(str(error))
+        self.translations = translations
+        self.error = error
+
+def _translate_each(texts: list[str]) -> list[str]:
+    translations, first_error = [], None
+    for text in texts:
+        try:
+            translations.append(translate_text_strict(text))
+        except Exception as e:
+            translations.append(None)
+            first_error = first_error or e
+    if first_error is not None:
+        raise PartialBatchError(translations, first_error)
+    return translations
+
+def translate_batch(texts: list[str]) -> list[str]:
+    if len(texts) == 1:
+        return [translate_text_strict(texts[0])]
+    try:
+        response = translate_batch_strict(format_batch(texts))
+    except Exception as e:
+        if classify_error(e)[0]:
+            # 限流或网络故障已由 rate_limiter 重试耗尽，逐段再发只会放大压力
+            raise
+        # 不可重试的错误（如内容被拒绝）可能只由其中一段引起，逐段翻译把失败限制在该段
+        return _translate_each(texts)
+    parts = split_batch_response(response, len(texts))
+    if parts is None:
+        # 模型没有按编号输出时退回逐段翻译，保证每段都有对应译文
+        return _translate_each(texts)
+    return parts
@@ -0,0 +1,40 @@
+import re
+from src.config.settings import MAX_TRANSLATION_UNIT_CHARS
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+def _split_long_sentence(sentence: str, max_chars: int) -> list[str]:
+    # 没有句末标点的超长句子只能按空格硬切
+    pieces = []
+    current = ""
+    for word in sentence.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_into_units(text: str, max_chars: int | None = None) -> list[str]:
+    limit = max_chars or MAX_TRANSLATION_UNIT_CHARS
+    if len(text) <= limit:
+        return [text]
+    units = []
+    current = ""
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        pieces = [sentence] if len(sentence) <= limit else _split_long_sentence(sentence, limit)
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > limit:
+                units.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        units.append(current)
+    return units
+
+def join_unit_translations(translations: list[str]) -> str:
+    # 中文句子之间不需要空格，直接拼接还原为一整段
+    return "".join(translations)
@@ -0,0 +1,118 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from src.config.settings import EPISODES_DIR, TRANSCRIPT_CACHE_MAX_BYTES, EDIT_LOG_COMPACT_BYTES
+from src.infra.file_cache import FileBackedLRUCache, file_signature
+from src.domain.transcript_format import parse_transcript_segments
+from src.service.translate_service import write_bilingual_file
+from src.service.structured_store import (
+    is_structured_fresh, load_structured, write_structured, read_segment, record_segment, TRANSLATION_META_FIELDS,
+)
+from src.service.segment_timeline import load_timestamps, attach_timestamps
+
+EDIT_LOG_SUFFIX = ".edits.jsonl"
+MERGED_CACHE_MAX_EPISODES = 64
+
+# 双语文件是基线，单段修改只追加到编辑日志，读取时叠加；日志变大后在后台合并回基线
+_base_cache = FileBackedLRUCache(TRANSCRIPT_CACHE_MAX_BYTES)
+_merged_cache = OrderedDict()
+_merged_lock = threading.Lock()
+_episode_locks = {}
+_episode_locks_guard = threading.Lock()
+
+def bilingual_path(slug: str) -> str:
+    return os.path.join(EPISODES_DIR, slug, "transcript_bilingual.txt")
+
+def edit_log_path(path: str) -> str:
+    return path + EDIT_LOG_SUFFIX
+
+def _episode_lock(slug: str) -> threading.Lock:
+    with _episode_locks_guard:
+        return _episode_locks.setdefault(slug, threading.Lock())
+
+def parse_bilingual_file(path: str) -> list[dict]:
+    # 结构化文件是最新的就直接按行加载 JSON，否则回退到解析文本格式
+    # 结构化来源额外带有翻译元数据，合并日志时原样保留；接口层负责去掉这些存储字段
+    ep_dir = os.path.dirname(path)
+    if is_structured_fresh(ep_dir, path):
+        return [record_segment(record) for record in load_structured(ep_dir)]
+    with open(path, "r", encoding="utf-8") as f:
+        return attach_timestamps(parse_transcript_segments(f.read()), load_timestamps(ep_dir))
+
+def _apply_edits(base: list[dict], log_path: str) -> list[dict]:
+    segments = list(base)
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                edit = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            index = edit["index"]
+            # 原稿重新生成后下标可能对应别的内容，只应用英文原文一致的修改
+            if 0 <= index < len(segments) and segments[index]["english"] == edit["english"]:
+                meta = {field: edit[field] for field in TRANSLATION_META_FIELDS if field in edit}
+                segments[index] = dict(segments[index], chinese=edit["chinese"], **meta)
+    return segments
+
+def load_segments(slug: str) -> list[dict]:
+    # 返回的列表在多个请求间共享，调用方不得原地修改
+    path = bilingual_path(slug)
+    base = _base_cache.get(path, parse_bilingual_file)
+    if base is None:
+        return []
+    log_path = edit_log_path(path)
+    log_signature = file_signature(log_path)
+    if log_signature is None:
+        return base
+    with _merged_lock:
+        cached = _merged_cache.get(path)
+        if cached and cached[0] is base and cached[1] == log_signature:
+            _merged_cache.move_to_end(path)
+            return cached[2]
+    merged = _apply_edits(base, log_path)
+    with _merged_lock:
+        _merged_cache[path] = (base, log_signature, merged)
+        if len(_merged_cache) > MERGED_CACHE_MAX_EPISODES:
+            _merged_cache.popitem(last=False)
+    return merged
+
+def _segment_english(slug: str, index: int) -> str | None:
+    # 结构化文件是最新的就按偏移只读这一段（编辑不改英文原文），不必加载整篇
+    path = bilingual_path(slug)
+    ep_dir = os.path.dirname(path)
+    if is_structured_fresh(ep_dir, path):
+        record = read_segment(ep_dir, index)
+        return record["english"] if record else None
+    segments = load_segments(slug)
+    return segments[index]["english"] if 0 <= index < len(segments) else None
+
+def update_segment(slug: str, index: int, chinese: str, metadata: dict | None = None) -> bool:
+    # 只追加一行日志并 fsync，耗时与节目长度无关；同一节目的修改由节目锁串行化
+    with _episode_lock(slug):
+        english = _segment_english(slug, index)
+        if english is None:
+            return False
+        log_path = edit_log_path(bilingual_path(slug))
+        # 翻译元数据随修改写入日志，合并回基线时只有这一段的 model/translated_at 改变
+        entry = {"index": index, "english": english, "chinese": chinese, **(metadata or {})}
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        should_compact = os.stat(log_path).st_size >= EDIT_LOG_COMPACT_BYTES
+    if should_compact:
+        threading.Thread(target=compact_episode, args=(slug,), daemon=True).start()
+    return True
+
+def compact_episode(slug: str) -> None:
+    # 先原子替换基线文件再删除日志；若中途崩溃，日志会被重复叠加，但结果相同
+    with _episode_lock(slug):
+        path = bilingual_path(slug)
+        log_path = edit_log_path(path)
+        if not os.path.exists(log_path):
+            return
+        segments = load_segments(slug)
+        write_bilingual_file(path, segments, [seg["chinese"] for seg in segments])
+        write_structured(os.path.dirname(path), segments)
+        os.remove(log_path)
@@ -0,0 +1,72 @@
+import os
+import json
+import bisect
+import threading
+from collections import OrderedDict
+from src.infra.atomic_write import atomic_write
+
+# 抓取时保存每个说话块的 [start, end]（秒），与 transcript.txt 的段落一一对应
+TIMESTAMPS_FILENAME = "timestamps.json"
+TIME_INDEX_CACHE_MAX = 64
+
+_time_index_cache = OrderedDict()
+_time_index_lock = threading.Lock()
+
+def timestamps_path(ep_dir: str) -> str:
+    return os.path.join(ep_dir, TIMESTAMPS_FILENAME)
+
+def write_timestamps(ep_dir: str, timestamps: list[tuple]) -> None:
+    # 翻译进行中的页面会同时读取该文件，原子替换避免读到写了一半的 JSON
+    with atomic_write(timestamps_path(ep_dir)) as f:
+        json.dump(timestamps, f)
+
+def load_timestamps(ep_dir: str) -> list[list] | None:
+    path = timestamps_path(ep_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def attach_timestamps(segments: list[dict], timestamps: list[list] | None) -> list[dict]:
+    # 段落数对不上说明英文稿被改动过，此时宁可不带时间戳也不能错位
+    if not timestamps or len(timestamps) != len(segments):
+        return segments
+    return [dict(seg, start=start, end=end) for seg, (start, end) in zip(segments, timestamps)]
+
+class TimeIndex:
+    # 说话块按时间顺序排列，start 单调；end 取前缀最大值保证单调，区间查询只需两次二分
+    def __init__(self, segments: list[dict]):
+        self.positions = []
+        self.starts = []
+        self.ends = []
+        running_end = float("-inf")
+        for position, seg in enumerate(segments):
+            if seg.get("start") is None or seg.get("end") is None:
+                continue
+            running_end = max(running_end, seg["end"])
+            self.positions.append(position)
+            self.starts.append(seg["start"])
+            self.ends.append(running_end)
+
+    def range(self, time_from: float, time_to: float) -> list[int]:
+        first = bisect.bisect_left(self.ends, time_from)
+        last = bisect.bisect_right(self.starts, time_to)
+        return self.positions[first:last]
+
+    def at(self, t: float) -> int | None:
+        found = self.range(t, t)
+        return found[0] if found else None
+
+def time_index_for(key: str, segments: list[dict]) -> TimeIndex:
+    # 以段落列表对象本身判断是否过期：文件变化后缓存层会返回新的列表对象
+    with _time_index_lock:
+        cached = _time_index_cache.get(key)
+        if cached and cached[0] is segments:
+            _time_index_cache.move_to_end(key)
+            return cached[1]
+    index = TimeIndex(segments)
+    with _time_index_lock:
+        _time_index_cache[key] = (segments, index)
+        if len(_time_index_cache) > TIME_INDEX_CACHE_MAX:
+            _time_index_cache.popitem(last=False)
+    return index
@@ -0,0 +1,115 @@
+import os
+import json
+import argparse
+import time
+import struct
+from src.config.settings import DEEPSEEK_MODEL
+from src.infra.atomic_write import atomic_write
+from src.domain.transcript_format import parse_transcript_segments, format_bilingual_text
+from src.service.segment_timeline import load_timestamps, attach_timestamps
+
+# 结构化存储：segments.jsonl 每行一个段落；segments.idx 是每行起始字节偏移（小端 uint64 序列），
+# 按下标读取单段只需两次 seek，不必解析整篇文本
+SEGMENTS_FILENAME = "segments.jsonl"
+OFFSETS_FILENAME = "segments.idx"
+OFFSET_FORMAT = struct.Struct("<Q")
+OFFSET_ITEM_SIZE = OFFSET_FORMAT.size
+SEGMENT_FIELDS = ("speaker", "english", "chinese", "start", "end", "model", "translated_at")
+# 翻译元数据只在译文真正产生时记录（翻译流水线、重新翻译），之后随段落原样传递
+TRANSLATION_META_FIELDS = ("model", "translated_at")
+
+def segments_path(ep_dir: str) -> str:
+    return os.path.join(ep_dir, SEGMENTS_FILENAME)
+
+def offsets_path(ep_dir: str) -> str:
+    return os.path.join(ep_dir, OFFSETS_FILENAME)
+
+def translation_metadata() -> dict:
+    return {"model": DEEPSEEK_MODEL, "translated_at": time.time()}
+
+def _to_record(segment: dict, index: int) -> dict:
+    record = {"index": index}
+    for field in SEGMENT_FIELDS:
+        record[field] = segment.get(field)
+    return record
+
+def write_structured(ep_dir: str, segments: list[dict]) -> None:
+    # 两个文件各自原子替换；偏移文件最后替换，读者不会拿到指向新数据的旧偏移
+    offsets = []
+    with atomic_write(segments_path(ep_dir), "wb") as f:
+        for index, segment in enumerate(segments):
+            offsets.append(f.tell())
+            line = json.dumps(_to_record(segment, index), ensure_ascii=False) + "\n"
+            f.write(line.encode("utf-8"))
+    with atomic_write(offsets_path(ep_dir), "wb") as f:
+        f.write(b"".join(OFFSET_FORMAT.pack(offset) for offset in offsets))
+
+def is_structured_fresh(ep_dir: str, bilingual_file: str) -> bool:
+    # 结构化文件不早于双语文本时才可直接使用，否则以文本为准重新导入
+    try:
+        return os.stat(offsets_path(ep_dir)).st_mtime_ns >= os.stat(bilingual_file).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+def load_structured(ep_dir: str) -> list[dict]:
+    with open(segments_path(ep_dir), "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def record_segment(record: dict) -> dict:
+    # 与文本解析 + attach_timestamps 的结果形状一致，另带翻译元数据；缺失的字段不出现
+    return {field: record[field] for field in SEGMENT_FIELDS if record.get(field) is not None}
+
+def segment_count(ep_dir: str) -> int:
+    return os.stat(offsets_path(ep_dir)).st_size // OFFSET_ITEM_SIZE
+
+def read_segment(ep_dir: str, index: int) -> dict | None:
+    if not 0 <= index < segment_count(ep_dir):
+        return None
+    with open(offsets_path(ep_dir), "rb") as f:
+        f.seek(index * OFFSET_ITEM_SIZE)
+        (offset,) = OFFSET_FORMAT.unpack(f.read(OFFSET_ITEM_SIZE))
+    with open(segments_path(ep_dir), "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+def _keep_metadata(ep_dir: str, segments: list[dict]) -> list[dict]:
+    # 文本格式不含翻译元数据：中英文都未改动的段落沿用原有记录，改动过的段落不再声称原来的来源
+    if not os.path.exists(segments_path(ep_dir)):
+        return segments
+    records = load_structured(ep_dir)
+    kept = []
+    for index, seg in enumerate(segments):
+        record = records[index] if index < len(records) else {}
+        same = record.get("english") == seg["english"] and record.get("chinese") == seg["chinese"]
+        meta = {field: record.get(field) for field in TRANSLATION_META_FIELDS} if same else {}
+        kept.append(dict(seg, **meta))
+    return kept
+
+def import_text(ep_dir: str, bilingual_file: str) -> list[dict]:
+    # 文本格式不含时间戳，导入时从 timestamps.json 补回
+    with open(bilingual_file, "r", encoding="utf-8") as f:
+        segments = attach_timestamps(parse_transcript_segments(f.read()), load_timestamps(ep_dir))
+    segments = _keep_metadata(ep_dir, segments)
+    write_structured(ep_dir, segments)
+    return segments
+
+def export_text(ep_dir: str, bilingual_file: str) -> None:
+    with atomic_write(bilingual_file) as f:
+        f.write(format_bilingual_text(load_structured(ep_dir)))
+
+def main():
+    # 手动转换：手工编辑双语稿后重新导入，或从结构化存储恢复文本格式
+    parser = argparse.ArgumentParser()
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("--ep-dir", dest="ep_dir", required=True)
+    args = parser.parse_args()
+    bilingual_file = os.path.join(args.ep_dir, "transcript_bilingual.txt")
+    if args.action == "import":
+        segments = import_text(args.ep_dir, bilingual_file)
+        print(f"已导入 {len(segments)} 个段落到 {segments_path(args.ep_dir)}")
+    else:
+        export_text(args.ep_dir, bilingual_file)
+        print(f"已导出到 {bilingual_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from src.config.settings import TRANSCRIPT_PAGE_SIZE_DEFAULT, TRANSCRIPT_PAGE_SIZE_MAX
+from src.service.segment_timeline import time_index_for
+
+# fields=en 只返回英文，fields=zh 只返回中文；speaker 与状态字段始终保留
+FIELD_EXCLUSIONS = {"en": {"chinese"}, "zh": {"english"}, "both": set()}
+# 段落里的翻译元数据只用于存储，不出现在接口返回中
+STORAGE_FIELDS = {"model", "translated_at"}
+
+def normalize_fields(fields: str | None) -> str:
+    return fields if fields in FIELD_EXCLUSIONS else "both"
+
+def public_segment(segment: dict) -> dict:
+    return {key: value for key, value in segment.items() if key not in STORAGE_FIELDS}
+
+def project_segment(segment: dict, index: int, fields: str) -> dict:
+    excluded = FIELD_EXCLUSIONS[fields] | STORAGE_FIELDS
+    projected = {key: value for key, value in segment.items() if key not in excluded}
+    projected["index"] = index
+    return projected
+
+def paginate_segments(segments: list[dict], offset: int | None, limit: int | None, fields: str | None) -> dict:
+    # 只有未传 limit 时才用默认页大小；0 或负数按最小页大小 1 处理，而不是悄悄变成默认值
+    start = max(0, offset or 0)
+    size = TRANSCRIPT_PAGE_SIZE_DEFAULT if limit is None else min(TRANSCRIPT_PAGE_SIZE_MAX, max(1, limit))
+    end = min(len(segments), start + size)
+    chosen_fields = normalize_fields(fields)
+    return {
+        "segments": [project_segment(segments[i], i, chosen_fields) for i in range(start, end)],
+        "offset": start,
+        "limit": size,
+        "total": len(segments),
+        "next_offset": end if end < len(segments) else None,
+    }
+
+def select_by_time(key: str, segments: list[dict], time_from, time_to, time_at, fields: str | None) -> list[dict]:
+    # 按时间（秒）查询：at 返回该时刻所在段落，from/to 返回与区间重叠的段落
+    time_index = time_index_for(key, segments)
+    if time_at is not None:
+        position = time_index.at(time_at)
+        positions = [] if position is None else [position]
+    else:
+        positions = time_index.range(time_from if time_from is not None else float("-inf"),
+                                     time_to if time_to is not None else float("inf"))
+    chosen_fields = normalize_fields(fields)
+    return [project_segment(segments[i], i, chosen_fields) for i in positions]
@@ -1,48 +1,123 @@
 import os
-from src.infra.deepseek_client import translate_text_strict
-
-def parse_transcript_segments(transcript_text: str) -> list[dict]:
-    segments = []
-    current = {"speaker": None, "english": "", "chinese": ""}
-    mode = "none"
-    for raw_line in transcript_text.splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
-        if line.startswith("[") and "]: " in line:
-            if current["speaker"] or current["english"] or current["chinese"]:
-                current["english"] = current["english"].strip()
-                current["chinese"] = current["chinese"].strip()
-                segments.append(current)
-            speaker = line[1:line.index("]: ")].strip()
-            text = line[line.index("]: ") + 3 :]
-            current = {"speaker": speaker, "english": text, "chinese": ""}
-            mode = "english"
-            continue
-        if line.startswith("(中文):"):
-            text = line[len("(中文):"):].strip()
-            current["chinese"] = text
-            mode = "chinese"
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.service.segment_batcher import plan_batches, translate_batch, PartialBatchError
+from src.service.segment_chunker import split_into_units, join_unit_translations
+from src.service.translation_journal import (
+    journal_path, load_journal, resume_translation, append_journal_entry, entry_metadata, truncate_torn_tail,
+)
+from src.domain.transcript_format import parse_transcript_segments, format_segment
+from src.service.structured_store import write_structured, translation_metadata
+from src.service.segment_timeline import load_timestamps, attach_timestamps
+from src.infra.atomic_write import atomic_write
+from src.config.settings import TRANSLATE_CONCURRENCY, PIPELINE_TRANSLATE_WINDOWS
+
+def _iter_batch_results(units: list[str], max_workers: int | None):
+    # 请求大部分时间在等网络，用线程池并发；按完成顺序产出结果，调用方按下标归位
+    workers = max_workers or TRANSLATE_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(translate_batch, [units[i] for i in batch]): batch for batch in plan_batches(units)}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except PartialBatchError as e:
+                yield futures[future], e.translations, e.error
+            except Exception as e:
+                yield futures[future], None, e
+
+def _split_texts(texts: list[str]) -> tuple[list[str], list[int], list[list[int]]]:
+    # 超长发言先切成多个翻译单元，与其他段落一起并发翻译，再按所属段落拼回
+    units, owners = [], []
+    unit_ids = [[] for _ in texts]
+    for index, text in enumerate(texts):
+        if not text:
             continue
-        if mode == "english":
-            current["english"] += " " + line
-        elif mode == "chinese":
-            current["chinese"] += "\n" + line
-    if current["speaker"] or current["english"] or current["chinese"]:
-        current["english"] = current["english"].strip()
-        current["chinese"] = current["chinese"].strip()
-        segments.append(current)
-    return segments
-
-def translate_file(input_path: str, output_path: str) -> None:
+        for unit in split_into_units(text):
+            unit_ids[index].append(len(units))
+            units.append(unit)
+            owners.append(index)
+    return units, owners, unit_ids
+
+def translate_texts(texts: list[str], max_workers: int | None = None, on_text_done=None) -> list[str]:
+    units, owners, unit_ids = _split_texts(texts)
+    unit_translations = [None] * len(units)
+    remaining = [len(ids) for ids in unit_ids]
+    translations = [""] * len(texts)
+    failed_units, first_error = 0, None
+    for batch, batch_translations, error in _iter_batch_results(units, max_workers):
+        if error is not None:
+            first_error = first_error or error
+        for unit_index, translation in zip(batch, batch_translations or [None] * len(batch)):
+            if translation is None:
+                failed_units += 1
+                continue
+            unit_translations[unit_index] = translation
+            owner = owners[unit_index]
+            remaining[owner] -= 1
+            if remaining[owner] == 0:
+                translations[owner] = join_unit_translations([unit_translations[i] for i in unit_ids[owner]])
+                if on_text_done:
+                    on_text_done(owner, translations[owner])
+    if failed_units:
+        # 其余段落已全部完成并回调，失败的段落留给下次重试
+        raise RuntimeError(f"{failed_units} 个翻译单元翻译失败：{first_error}") from first_error
+    return translations
+
+def write_bilingual_file(output_path: str, segments: list[dict], translations: list[str]) -> None:
+    # 先写临时文件再原子替换，读者永远不会看到写了一半的双语稿
+    with atomic_write(output_path) as f:
+        for seg, translation in zip(segments, translations):
+            f.write(format_segment(seg["speaker"], seg["english"], translation))
+
+def _translate_window(pending: list[int], segments: list[dict], translations: list, metadata: list,
+                      journal_file, journal_lock, max_workers: int | None) -> None:
+    # 每完成一段就追加到旁路日志；中途失败重启时只翻译缺失的段落
+    def record(position: int, translation: str) -> None:
+        index = pending[position]
+        translations[index] = translation
+        metadata[index] = translation_metadata()
+        with journal_lock:
+            append_journal_entry(journal_file, index, segments[index]["english"], translation, metadata[index])
+    translate_texts([segments[i]["english"] for i in pending], max_workers, record)
+
+def _publish(output_path: str, segments: list[dict], translations: list[str], metadata: list[dict]) -> None:
+    write_bilingual_file(output_path, segments, translations)
+    ep_dir = os.path.dirname(output_path)
+    translated = [dict(seg, chinese=t, **meta) for seg, t, meta in zip(segments, translations, metadata)]
+    write_structured(ep_dir, attach_timestamps(translated, load_timestamps(ep_dir)))
+    os.remove(journal_path(output_path))
+
+def translate_stream(windows, output_path: str, max_workers: int | None = None) -> int:
+    # windows 逐批产出段落列表：每批到达即开始翻译，与上游抓取和其他批次的翻译重叠；
+    # 全部批次完成后才写出双语稿与结构化文件
+    # metadata 与 translations 一一对应：本次翻译的段落记录当时的模型与时间，从日志恢复的沿用日志中的记录
+    segments, translations, metadata, futures = [], [], [], []
+    journal = journal_path(output_path)
+    entries = load_journal(journal)
+    truncate_torn_tail(journal)
+    journal_lock = threading.Lock()
+    with open(journal, "a", encoding="utf-8") as journal_file, \
+            ThreadPoolExecutor(max_workers=PIPELINE_TRANSLATE_WINDOWS) as executor:
+        for window in windows:
+            start = len(segments)
+            segments.extend(window)
+            for i, seg in enumerate(window):
+                entry = entries.get(start + i)
+                translations.append(resume_translation(seg, entry))
+                metadata.append(entry_metadata(entry) if translations[-1] else {})
+            pending = [start + i for i in range(len(window)) if translations[start + i] is None]
+            if pending:
+                futures.append(executor.submit(_translate_window, pending, segments, translations, metadata,
+                                               journal_file, journal_lock, max_workers))
+    errors = [future.exception() for future in futures if future.exception()]
+    if len(errors) == 1:
+        raise errors[0]
+    if errors:
+        raise RuntimeError(f"{len(errors)} 批段落存在翻译失败：{errors[0]}") from errors[0]
+    _publish(output_path, segments, translations, metadata)
+    return len(segments)
+
+def translate_file(input_path: str, output_path: str, max_workers: int | None = None) -> int:
     with open(input_path, "r", encoding="utf-8") as f:
         content = f.read()
-    segments = parse_transcript_segments(content)
-    with open(output_path, "w", encoding="utf-8") as f:
-        for seg in segments:
-            speaker = seg["speaker"]
-            english = seg["english"]
-            translation = translate_text_strict(english) if english else ""
-            f.write(f"[{speaker}]: {english}\n")
-            f.write(f"(中文): {translation}\n\n")
-
+    return translate_stream([parse_transcript_segments(content)], output_path, max_workers)
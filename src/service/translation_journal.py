@@ -0,0 +1,63 @@
+import os
+import json
+from src.service.structured_store import TRANSLATION_META_FIELDS
+
+JOURNAL_SUFFIX = ".journal"
+TAIL_SCAN_BYTES = 4096
+
+def journal_path(output_path: str) -> str:
+    return output_path + JOURNAL_SUFFIX
+
+def load_journal(path: str) -> dict[int, dict]:
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # 进程中途崩溃时最后一行可能只写了一半，丢弃即可，重启后会重新翻译该段
+                continue
+            entries[entry["index"]] = entry
+    return entries
+
+def truncate_torn_tail(path: str) -> None:
+    # 崩溃可能留下没有换行结尾的半行；若直接以追加模式续写，下一条完整记录会接在半行后面，
+    # 两条一起解析失败。续写前从文件末尾找到最后一个换行，截掉其后的残余
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        return
+    with f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        while end > 0:
+            start = max(0, end - TAIL_SCAN_BYTES)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+
+def resume_translation(seg: dict, entry: dict | None) -> str | None:
+    # 只复用英文原文完全一致的记录；原稿变化后对应段落需要重新翻译
+    if not seg["english"]:
+        return ""
+    if entry and entry.get("english") == seg["english"]:
+        return entry["chinese"]
+    return None
+
+def entry_metadata(entry: dict | None) -> dict:
+    # 旧日志没有翻译元数据时返回空字典，结构化文件中对应字段为空
+    if not entry:
+        return {}
+    return {field: entry[field] for field in TRANSLATION_META_FIELDS if entry.get(field) is not None}
+
+def append_journal_entry(journal_file, index: int, english: str, chinese: str, metadata: dict) -> None:
+    entry = {"index": index, "english": english, "chinese": chinese, **metadata}
+    journal_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    journal_file.flush()
@@ -17,9 +17,11 @@ if [ -f ".env" ]; then
 fi
 
 # Check if required packages are installed (simple check)
-if ! python3 -c "import flask" &> /dev/null; then
+if ! python3 -c "import starlette, uvicorn, jinja2" &> /dev/null; then
     echo "Installing dependencies..."
-    pip install flask flask-cors openai beautifulsoup4 requests
+    pip install flask flask-cors openai beautifulsoup4 requests starlette uvicorn jinja2
 fi
 
-python3 src/api/server.py
+# ASGI 模式（uvicorn）：LLM 调用与文件读取不会阻塞其他请求
+# 如需 Flask 开发服务器调试，可直接运行 python3 src/api/server.py
+python3 src/api/asgi_server.py
@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import requests
+
+from src.infra import http_client
+from src.config.settings import HTTP_CACHE_DIRNAME
+
+
+class _RecordingHandler(SimpleHTTPRequestHandler):
+    # SimpleHTTPRequestHandler 自带 Last-Modified 与 If-Modified-Since → 304；这里额外记录每次请求
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("If-Modified-Since")))
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+class ConditionalFetchTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.serve_dir = os.path.join(self.root, "site")
+        self.cache_dir = os.path.join(self.root, "episode")
+        os.makedirs(self.serve_dir)
+        with open(os.path.join(self.serve_dir, "transcript.json"), "w", encoding="utf-8") as f:
+            f.write('[{"text": "hello"}]')
+        handler = partial(_RecordingHandler, directory=self.serve_dir)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/transcript.json"
+        http_client.set_session(requests.Session())
+
+    def tearDown(self):
+        http_client.set_session(None)
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root)
+
+    def test_first_fetch_downloads_and_writes_cache(self):
+        result = http_client.fetch(self.base_url, self.cache_dir, "transcript")
+        self.assertFalse(result["from_cache"])
+        self.assertEqual(result["content"], b'[{"text": "hello"}]')
+        self.assertEqual(self.server.requests, [("/transcript.json", None)])
+        cache_files = sorted(os.listdir(os.path.join(self.cache_dir, HTTP_CACHE_DIRNAME)))
+        self.assertEqual(cache_files, ["transcript.body", "transcript.meta.json"])
+
+    def test_second_fetch_revalidates_and_uses_cache(self):
+        http_client.fetch(self.base_url, self.cache_dir, "transcript")
+        result = http_client.fetch(self.base_url, self.cache_dir, "transcript")
+        self.assertTrue(result["from_cache"])
+        self.assertEqual(http_client.fetch_json(self.base_url, self.cache_dir, "transcript"), [{"text": "hello"}])
+        self.assertIsNotNone(self.server.requests[1][1])
+
+    def test_signed_url_with_new_query_still_revalidates(self):
+        http_client.fetch(self.base_url + "?Signature=first", self.cache_dir, "transcript")
+        result = http_client.fetch(self.base_url + "?Signature=second", self.cache_dir, "transcript")
+        self.assertTrue(result["from_cache"])
+        self.assertEqual(self.server.requests[1][0], "/transcript.json?Signature=second")
+        self.assertIsNotNone(self.server.requests[1][1])
+
+    def test_changed_file_is_downloaded_again(self):
+        http_client.fetch(self.base_url, self.cache_dir, "transcript")
+        path = os.path.join(self.serve_dir, "transcript.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('[{"text": "updated"}]')
+        # Last-Modified 精度为秒，把修改时间推后确保服务端判断为已变化
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        result = http_client.fetch(self.base_url, self.cache_dir, "transcript")
+        self.assertFalse(result["from_cache"])
+        self.assertEqual(result["content"], b'[{"text": "updated"}]')
+
+
+if __name__ == "__main__":
+    unittest.main()